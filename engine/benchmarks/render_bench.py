@@ -0,0 +1,257 @@
+"""
+Rendering benchmark : draws frames of each mode of CursesUI (exploration, dialogue, inventory, combat, shop)
+on generated scenes of growing size, without any terminal, and reports frames per second and draw calls per frame.
+
+From the project root :
+    python -m engine.benchmarks.render_bench
+    python -m engine.benchmarks.render_bench --quick --frames 50 --json render.json
+    python -m engine.benchmarks.render_bench --pipeline    # frames also go through the FrameBuffer and the ANSI backend
+
+Every frame is drawn like in CursesUI.main_loop : the mode draw function and the borders, into a RecordingScreen
+(a fake stdscr that counts the addstr calls and the characters). With --pipeline, the frame is drawn into the
+FrameBuffer, its diff is sent to an AnsiBackend on a FakeTerminal, and the bytes really written are reported too.
+"""
+import argparse
+import json
+import random
+import time
+
+from engine.core.base import UniverseData, World, Entity
+from engine.core.MapGrid import MapGrid, MapLayout
+import engine.core.ItemManager as ItemManager
+from engine.core.ItemManager import item_list_renderer, dealItem
+from engine.core.CombatSystem import combat_system
+from engine.core.DialogueSystem import dialogue_system
+from engine.core.SpriteCache import sprite_cache, sprite_path
+from engine.ui.backends import AnsiBackend, FakeTerminal
+from engine.ui.curses_ui import CursesUI
+from engine.ui.frame_buffer import FrameBuffer
+
+SCREEN_SIZE = (20 * 2, 71)  # same default size as main.py
+
+
+class RecordingScreen:
+    """Fake stdscr : keeps nothing on screen, only counts what is written"""
+    def __init__(self, height, width):
+        self.height = height
+        self.width = width
+        self.calls = 0
+        self.chars = 0
+
+    def addstr(self, y, x, text, *attributes):
+        self.calls += 1
+        self.chars += len(text)
+
+    def erase(self):
+        pass
+
+    def getmaxyx(self):
+        return self.height, self.width
+
+
+def generate_rows(height, width, seed=0):
+    """Bordered map with walls, floor and some wide characters (trees, followed by their £ tile)"""
+    rng = random.Random(seed)
+    inner = max(0, width - 2)
+    rows = ["%" * width]
+    for _ in range(height - 2):
+        cells = "".join(rng.choices(("#", " ", ".", ",", "🌳"), weights=(8, 30, 30, 30, 2), k=inner))
+        cells = cells.replace("🌳", "🌳£")[:inner]
+        if cells.endswith("🌳"):
+            cells = cells[:-1] + " "  # no room left for its £
+        rows.append("%" + cells + "%")
+    rows.append("%" * width)
+    return rows
+
+
+class GeneratedWorld(World):
+    def __init__(self, data, height, width, seed=0):
+        self.size = (height, width)
+        self.seed = seed
+        super().__init__(data, f"generated_{height}x{width}", f"<generated {height}x{width}>")
+
+    def load_map(self):
+        return MapGrid(MapLayout(generate_rows(*self.size, self.seed)), self.walkable_tiles)
+
+
+class RenderBench:
+    def __init__(self, frames=200, pipeline=False, seed=0):
+        self.frames = frames
+        self.pipeline = pipeline
+        self.seed = seed
+        self.universe = UniverseData("default", SCREEN_SIZE, "render_bench", "bench", (1, 1), journal=False)
+        self.ui = CursesUI(self.universe)
+        self.results = []
+
+    def set_mode(self, mode):
+        self.universe.mode_change(mode)
+
+    def measure(self, scenario, params, on_frame=None):
+        """Draw self.frames frames of the current mode, on_frame(i) is called before each frame"""
+        ui = self.ui
+        height, width = SCREEN_SIZE[0] + 1, SCREEN_SIZE[1] + 1
+        screen = RecordingScreen(height, width)
+        frame = FrameBuffer(height, width) if self.pipeline else None
+        terminal = FakeTerminal(height, width)
+        backend = AnsiBackend(terminal)
+        elapsed = 0.0
+        for i in range(self.frames):
+            if on_frame is not None:
+                on_frame(i)
+            start = time.perf_counter()
+            target = screen
+            if frame is not None:
+                frame.erase()
+                target = frame
+            ui.mode_draw_function(ui, target)
+            ui.draw_border(ui.screens["scene"]["position"], ui.screens["scene"]["size"], target)
+            ui.draw_border(ui.screens["hud"]["position"], ui.screens["hud"]["size"], target)
+            if frame is not None:
+                for y, x, text in frame.diff():
+                    screen.addstr(y, x, text)
+                    backend.write(y, x, text)
+                backend.refresh()
+            elapsed += time.perf_counter() - start
+
+        result = {
+            "scenario": scenario,
+            "params": params,
+            "frames": self.frames,
+            "fps": self.frames / elapsed if elapsed else 0.0,
+            "ms_per_frame": elapsed / self.frames * 1000,
+            "draw_calls_per_frame": screen.calls / self.frames,
+            "chars_per_frame": screen.chars / self.frames,
+        }
+        if self.pipeline:
+            result["bytes_per_frame"] = terminal.bytes / self.frames
+        self.results.append(result)
+        return result
+
+    # scenarios
+
+    def exploration(self, map_size, entity_counts):
+        """One generated world per map size, with each number of entities"""
+        height, width = map_size
+        world = GeneratedWorld(self.universe, height, width, self.seed)
+        self.universe.scenes[world.name] = world
+        self.universe.current_world = world.name
+        player = self.universe.player
+        player.world = world
+        self.set_mode("exploration")
+
+        # the player walks along the middle row, back and forth, so the camera scrolls
+        row = height // 2
+        path = list(range(1, width - 1)) or [1]
+        path += path[::-1]
+
+        def walk(i):
+            player.set_position((row, path[i % len(path)]))
+
+        rng = random.Random(self.seed)
+        results = []
+        for entity_count in entity_counts:
+            while len(world.entities) < entity_count:
+                position = (rng.randrange(1, height - 1), rng.randrange(1, width - 1))
+                world.add_entity(Entity(world, f"npc{len(world.entities)}", position, "N"))
+            results.append(self.measure("exploration", {"map": f"{height}x{width}", "entities": entity_count}, walk))
+        del self.universe.scenes[world.name]
+        return results
+
+    def dialogue(self, words):
+        text = " ".join(f"word{i}" for i in range(words))
+        dialogue_system.dialogues = [{"speaker": "bench_speaker", "text": text}]
+        dialogue_system.index = 0
+        dialogue_system.set_current_dialogue()
+        sprite_cache.add(sprite_path("bench_speaker"), generate_sprite(20, 12))
+        self.set_mode("dialogue")
+        pages = len(dialogue_system.pages)
+
+        def next_page(i):
+            dialogue_system.page_index = i % pages  # reads the pages one after the other
+
+        return self.measure("dialogue", {"words": words, "pages": pages}, next_page)
+
+    def item_list(self, mode, item_count):
+        generated = {f"bench_item_{i}": {"name": f"Item {i}", "type": ("consumable", "equipment")[i % 2],
+                                         "price": i * 3} for i in range(item_count)}
+        ItemManager.items.update(generated)
+        item_list_renderer.set_list({item_id: i + 1 for i, item_id in enumerate(generated)}, "Bench")
+        item_list_renderer.focused = False
+        dealItem.mode = "use"  # no shop needed
+        self.set_mode(mode)
+        result = self.measure(mode, {"items": item_count})
+        for item_id in generated:
+            del ItemManager.items[item_id]
+        return result
+
+    def combat(self, enemy_count):
+        combat_system.fighters = []
+        for i in range(enemy_count):
+            enemy_id = f"bench_enemy_{i}"
+            sprite_cache.add(sprite_path(enemy_id), generate_sprite(8, 5, seed=i))
+            combat_system.fighters.append(combat_system.Enemy(combat_system, {"id": enemy_id, "name": f"E{i}", "hp": 10}))
+        combat_system.state = "PLAYER_TURN"
+        combat_system.queue = ["PLAYER_CHOICE"]
+        self.set_mode("combat")
+        result = self.measure("combat", {"enemies": enemy_count})
+        combat_system.fighters = []
+        combat_system.queue = []
+        return result
+
+    def run(self, map_sizes, entity_counts, dialogue_words, item_counts, enemy_counts):
+        for map_size in map_sizes:
+            self.exploration(map_size, sorted(entity_counts))
+        for words in dialogue_words:
+            self.dialogue(words)
+        for item_count in item_counts:
+            self.item_list("inventory", item_count)
+            self.item_list("shop", item_count)
+        for enemy_count in enemy_counts:
+            self.combat(enemy_count)
+        self.set_mode("exploration")
+        return self.results
+
+
+def generate_sprite(width, height, seed=0):
+    rng = random.Random(seed)
+    return ["".join(rng.choice(" /\\|_-o") for _ in range(width)) for _ in range(height)]
+
+
+def print_results(results):
+    pipeline = any("bytes_per_frame" in result for result in results)
+    header = f"{'scenario':<12}{'parameters':<30}{'fps':>10}{'ms/frame':>10}{'draws':>8}{'chars':>8}"
+    print(header + (f"{'bytes':>9}" if pipeline else ""))
+    for result in results:
+        params = ", ".join(f"{key}={value}" for key, value in result["params"].items())
+        line = (f"{result['scenario']:<12}{params:<30}{result['fps']:>10.0f}{result['ms_per_frame']:>10.3f}"
+                f"{result['draw_calls_per_frame']:>8.1f}{result['chars_per_frame']:>8.0f}")
+        if pipeline:
+            line += f"{result['bytes_per_frame']:>9.0f}"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the rendering of each UI mode on generated scenes.")
+    parser.add_argument("--frames", type=int, default=200, help="frames drawn per scenario")
+    parser.add_argument("--quick", action="store_true", help="only the small sizes")
+    parser.add_argument("--pipeline", action="store_true", help="also diff the frames and write them to a fake terminal")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write the results in this file")
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        sizes = dict(map_sizes=[(50, 100)], entity_counts=[0, 100], dialogue_words=[50, 2000],
+                     item_counts=[10, 200], enemy_counts=[1, 3])
+    else:
+        sizes = dict(map_sizes=[(50, 100), (500, 1000), (2000, 4000)], entity_counts=[0, 100, 1000],
+                     dialogue_words=[50, 2000, 50000], item_counts=[10, 200, 5000], enemy_counts=[1, 3, 6])
+    bench = RenderBench(args.frames, args.pipeline, args.seed)
+    results = bench.run(**sizes)
+    print_results(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Save benchmark : saves and loads generated universes with thousands of entities in each save format
+(engine/core/SaveCodec.py) and reports the file size and the time of each step.
+
+From the project root :
+    python -m engine.benchmarks.save_bench
+    python -m engine.benchmarks.save_bench --quick --json saves.json
+
+For each format and number of entities :
+- save_ms : a full save, every scene encoded again, until the file is on the disk
+- change_ms : a save after 10 entities moved (only them are encoded again)
+- decode_ms : reading and decoding the universe file and the file of the scene
+- load_ms : a new UniverseData restored from the save (worlds, entities and events rebuilt)
+The saves are written in a temporary folder, nothing is left in saves/. The save journal is off, only the saves
+are measured.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+import engine.core.base as base
+from engine.core.base import UniverseData, Entity, Event
+from engine.core.SaveCodec import BinaryCodec, JsonCodec, read_save
+from engine.benchmarks.render_bench import GeneratedWorld
+
+MAP_SIZE = (100, 200)
+WORLD_NAME = "generated_{}x{}".format(*MAP_SIZE)
+FORMATS = {
+    "json": JsonCodec,
+    "binary": lambda: BinaryCodec(compress=False),
+    "binary+zlib": BinaryCodec,
+}
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return (time.perf_counter() - start) * 1000, result
+
+
+class SaveBench:
+    def __init__(self, seed=0):
+        self.seed = seed
+        self.results = []
+        # the generated world can be restored by name like the worlds of data_extensions.py
+        base.worlds[WORLD_NAME] = lambda data, **kwargs: GeneratedWorld(data, *MAP_SIZE, seed)
+
+    def populate(self, universe, entity_count):
+        world = universe.scenes[WORLD_NAME]
+        rng = random.Random(self.seed)
+        for i in range(entity_count):
+            position = (rng.randrange(1, MAP_SIZE[0] - 1), rng.randrange(1, MAP_SIZE[1] - 1))
+            entity = world.add_entity(Entity(world, f"npc{i}", position, rng.choice("NMBG"), walkable=i % 7 == 0))
+            if i % 10 == 0:
+                entity.add_event(Event(universe, world, f"talk{i}", "ON_INTERACT", "DIALOGUE", entity,
+                                       dialogue="assets/dialogues/default_dialogue.json"))
+        universe.player.inventory.add_item("potion", 3)
+        return world
+
+    def measure(self, format_name, entity_count):
+        name = f"save_bench_{format_name.replace('+', '_')}_{entity_count}"
+        universe = UniverseData(WORLD_NAME, (40, 71), name, "bench", (1, 1), save_format=FORMATS[format_name](),
+                                journal=False)
+        world = self.populate(universe, entity_count)
+        filename = "saves/{}/{}".format(name, name) + universe.save_codec.extension
+        scene_filename = universe.scene_path(WORLD_NAME) + universe.save_codec.extension
+
+        save_ms, _ = timed(lambda: universe.save_save(wait=True))
+        size = os.path.getsize(filename) + os.path.getsize(scene_filename)
+
+        rng = random.Random(self.seed)
+        for entity in rng.sample(list(world.entities.values()), min(10, entity_count)):
+            entity.set_position((rng.randrange(1, MAP_SIZE[0] - 1), rng.randrange(1, MAP_SIZE[1] - 1)))
+        change_ms, _ = timed(lambda: universe.save_save(wait=True))
+
+        decode_ms, (_, data) = timed(lambda: (read_save(filename), read_save(scene_filename)))
+        load_ms, loaded = timed(lambda: UniverseData(WORLD_NAME, (40, 71), name, "bench", (1, 1),
+                                                           journal=False))
+        assert len(loaded.scenes[WORLD_NAME].entities) == entity_count == len(data["scene"]["entities"])
+
+        result = {"format": format_name, "entities": entity_count, "bytes": size, "save_ms": save_ms,
+                  "change_ms": change_ms, "decode_ms": decode_ms, "load_ms": load_ms}
+        self.results.append(result)
+        return result
+
+    def run(self, entity_counts, formats=tuple(FORMATS)):
+        for entity_count in entity_counts:
+            for format_name in formats:
+                self.measure(format_name, entity_count)
+        return self.results
+
+
+def print_results(results):
+    print(f"{'format':<14}{'entities':>9}{'bytes':>11}{'save_ms':>10}{'change_ms':>11}{'decode_ms':>11}{'load_ms':>10}")
+    for result in results:
+        print(f"{result['format']:<14}{result['entities']:>9}{result['bytes']:>11}{result['save_ms']:>10.1f}"
+              f"{result['change_ms']:>11.1f}{result['decode_ms']:>11.1f}{result['load_ms']:>10.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the size and the speed of each save format.")
+    parser.add_argument("--quick", action="store_true", help="only 1000 entities")
+    parser.add_argument("--entities", type=int, nargs="+", help="numbers of entities (default 1000 5000 20000)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write the results in this file")
+    args = parser.parse_args(argv)
+
+    entity_counts = args.entities or ([1000] if args.quick else [1000, 5000, 20000])
+    json_path = os.path.abspath(args.json) if args.json else None
+    project = os.getcwd()
+    with tempfile.TemporaryDirectory() as folder:
+        os.chdir(folder)  # the saves are relative to the current folder
+        try:
+            results = SaveBench(args.seed).run(entity_counts)
+        finally:
+            os.chdir(project)
+    print_results(results)
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=1)
+
+
+if __name__ == "__main__":
+    main()
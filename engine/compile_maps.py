@@ -0,0 +1,28 @@
+import os
+import sys
+import time
+
+# Compile every map of assets/maps/ into assets/maps/maps.pack, the worlds load their map from the pack
+# (memory-mapped, no text parsing) as long as the .txt file did not change since the compilation.
+# Run it again after editing your maps : python engine/compile_maps.py
+
+path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, path)
+os.chdir(path)
+
+from engine.core.MapGrid import DEFAULT_WALKABLE_TILES
+from engine.core.MapPack import write_pack, DEFAULT_PACK_PATH
+
+
+def main():
+    maps_dir = os.path.dirname(DEFAULT_PACK_PATH)
+    # the *_FORMAT.txt files are the explanation files made by setup_environment.py, not maps
+    sources = sorted(os.path.join(maps_dir, file_name) for file_name in os.listdir(maps_dir)
+                     if file_name.endswith(".txt") and not file_name.endswith("_FORMAT.txt"))
+    start = time.perf_counter()
+    write_pack(DEFAULT_PACK_PATH, sources, DEFAULT_WALKABLE_TILES)
+    print(f"{len(sources)} maps compiled in {DEFAULT_PACK_PATH} ({time.perf_counter() - start:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ import os
 import json
 import random
 import engine.core.ItemManager as ItemManager
+from engine.core.SpriteCache import sprite_cache, sprite_path
 
 
 def load_enemies_list(file_path="assets/enemies/enemies.json"):
@@ -234,6 +235,8 @@ class CombatSystem:
                         i+= 1
                         if i >= self.max_enemies:
                             break
+        # the sprites are read now, not while drawing the fight
+        sprite_cache.preload(sprite_path(fighter.id) for fighter in self.fighters)
 
 
 combat_system = CombatSystem(None)
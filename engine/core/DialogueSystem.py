@@ -3,27 +3,63 @@ import os    # used to check file paths
 
 from engine.core.ItemManager import dealItem
 from engine.core.ShopSystem import shop_manager
+from engine.core.SpriteCache import sprite_cache, sprite_path
+from engine.core.TextWidth import text_width
+
+
+def wrap_text(text, width):
+    """Lines of at most `width` columns, cut between words (words too long are cut with a '-'), newlines kept"""
+    width = max(2, width)
+    lines = []
+    for paragraph in text.split("\n"):
+        current_line = ""
+        for word in paragraph.split():
+            while text_width(word) > width:
+                if current_line:
+                    lines.append(current_line)
+                    current_line = ""
+                lines.append(word[:width - 1] + "-")
+                word = word[width - 1:]
+            if not current_line:
+                current_line = word
+            elif text_width(current_line) + 1 + text_width(word) <= width:
+                current_line += " " + word
+            else:
+                lines.append(current_line)
+                current_line = word
+        lines.append(current_line)
+    return lines
+
+
+def paginate(text, max_lines, width):
+    """Pages (lists of at most max_lines lines) of a dialogue text, at least one page even for an empty text"""
+    lines = wrap_text(text, width) if text.strip() else []
+    max_lines = max(1, max_lines)
+    return [lines[start:start + max_lines] for start in range(0, len(lines), max_lines)] or [[]]
+
 
 class DialogueSystem:
     """Manage dialogue flow for the game: loading dialogues,
     handling choices, and advancing lines or branches.
-    Text is kept in `current_dialogue` and the UI is responsible for segmentation/drawing.
+    The text of the current line is cut once in `pages` that fit the page size given by the UI,
+    the UI only draws `current_page()`.
     """
     def __init__(self, universe):
         # store reference to the game universe to trigger mode changes when dialogues end
         self.universe = universe
         # list of dialogue entries loaded from a JSON file
         self.dialogues = []
-        # remaining text of the current dialogue line yet to be shown
+        # text of the current dialogue line and its pages (lists of lines), see set_page_size
         self.current_dialogue = ""
-        self.current_say = ""
+        self.pages = [[]]
+        self.page_index = 0
+        self.page_size = (9, 69)  # (lines, columns) of a page, the UI sets the size of its dialogue area
         # state controls how the system behaves: NEXT_LINE, TEXT_CHUNK, CHOICE
         self.state = "NEXT_LINE"
         # list of visible choice texts for the current dialogue entry
         self.choices = []
         # index of the current dialogue entry in self.dialogues
         self.index = -1
-        self.max_length = 100 # max size for now, UI handles wrapping/segmenting
 
         self.speaker = None
 
@@ -69,9 +105,11 @@ class DialogueSystem:
             if key.startswith("player:"):
                 subkey = key.split(":", 1)[1]
                 self.universe.player.ext_data[subkey] = value
+                self.universe.journal.ext_data("player", subkey, value)
             elif key.startswith("universe:"):
                 subkey = key.split(":", 1)[1]
                 self.universe.ext_data[subkey] = value
+                self.universe.journal.ext_data("universe", subkey, value)
             elif key.startswith("give_item:"):
                 item_id = key.split(":", 1)[1]
                 if int(value) > 0:
@@ -91,6 +129,7 @@ class DialogueSystem:
 
             else:
                 self.universe.player.ext_data[key] = value
+                self.universe.journal.ext_data("player", key, value)
 
     def set_dialogues(self, file_path):
         """Load dialogues from file_path if it exists, otherwise fall back to default."""
@@ -100,20 +139,39 @@ class DialogueSystem:
         else:
             with open("assets/dialogues/default_dialogues.json", 'r') as file:
                 self.dialogues = json.load(file)
+        # the sprites of the speakers are read now, not while drawing the dialogue
+        sprite_cache.preload({sprite_path(dialogue["speaker"]) for dialogue in self.dialogues
+                              if dialogue.get("speaker") is not None})
         self.index = 0
         self.set_current_dialogue()
 
+    def set_page_size(self, max_lines, width):
+        """Size of the dialogue area of the UI, the current text is cut again only if it changed"""
+        if (max_lines, width) != self.page_size:
+            self.page_size = (max_lines, width)
+            self.pages = paginate(self.current_dialogue, max_lines, width)
+            self.page_index = min(self.page_index, len(self.pages) - 1)
+            self.notify_reading_consumed()
+
+    def current_page(self):
+        return self.pages[self.page_index]
+
+    def next_page(self):
+        """Show the next page of the text, after the last one comes the choices or the next line"""
+        if self.page_index < len(self.pages) - 1:
+            self.page_index += 1
+        if self.page_index == len(self.pages) - 1:
+            self.notify_reading_consumed()
+
     def set_current_dialogue(self):
-        """Set self.current_dialogue and determine the next state based on length
+        """Set self.current_dialogue, cut it in pages and determine the next state based on the number of pages
         and presence of options for choice-based branching."""
         if 0 <= self.index < len(self.dialogues):
             if self.check_requirements(self.dialogues[self.index].get("require", None)):
                 self.current_dialogue = self.dialogues[self.index].get("text", "")
-                if len(self.current_dialogue) > self.max_length:
-                    self.state = "TEXT_CHUNK"
-                elif "options" in self.dialogues[self.index]:
-                    self.state = "CHOICE"
-                    self.set_choices()
+                self.pages = paginate(self.current_dialogue, *self.page_size)
+                self.page_index = 0
+                self.notify_reading_consumed()
             else:
                 self.index += 1
                 self.set_current_dialogue()
@@ -124,25 +182,23 @@ class DialogueSystem:
 
     def notify_reading_consumed(self):
         """
-        Called by the UI when it has finished displaying the current dialogue text.
-        Ensures an immediate transition:
-          - to `CHOICE` (and populates choices) if the current entry has options,
-          - to `NEXT_LINE` if there are no options,
-          - or keeps `TEXT_CHUNK` if there is still remaining text.
+        Called when the page shown changes. Ensures an immediate transition:
+          - to `CHOICE` (and populates choices) on the last page if the current entry has options,
+          - to `NEXT_LINE` on the last page if there are no options,
+          - or `TEXT_CHUNK` if there are still pages to read.
         """
         # ensure index valid
         if not (0 <= self.index < len(self.dialogues)):
             return
 
-        # treat empty/whitespace-only as consumed
-        if self.current_dialogue.strip() == "":
+        if self.page_index >= len(self.pages) - 1:
             if self.as_choices():
                 self.state = "CHOICE"
                 self.set_choices()
             else:
                 self.state = "NEXT_LINE"
         else:
-            # still has text -> remain in TEXT_CHUNK
+            # still has pages -> TEXT_CHUNK
             self.state = "TEXT_CHUNK"
 
     def set_choices(self):
@@ -165,8 +221,10 @@ class DialogueSystem:
         else:
             self.index += 1
 
-        # clear remaining raw dialogue text (UI will receive new text after set_current_dialogue)
+        # clear the text (UI will receive new text after set_current_dialogue)
         self.current_dialogue = ""
+        self.pages = [[]]
+        self.page_index = 0
         # if index is out of range or set to -1, return to exploration mode in universe
         if self.index == -1 or self.index >= len(self.dialogues):
             if self.universe.mode == "dialogue":
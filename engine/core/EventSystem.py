@@ -1,24 +1,82 @@
+ACTIVATION_TYPES = ("ON_STEP", "ON_INTERACT", "ALWAYS")
+MOVEMENT_ACTIONS = ("UP", "DOWN", "LEFT", "RIGHT")
+
+
 class EventSystem:
     def __init__(self, world):
         self.world = world
-        self.events = []
-
-
+        self.events = {}  # id(event) -> event, every event of the world in insertion order
+        # indexes so an action only looks at the events that can be concerned by it
+        self.by_position = {}  # tile -> list of events triggered from this tile
+        self.by_activation = {activation_type: {} for activation_type in ACTIVATION_TYPES}
 
     def add_event(self, event):
-        self.events.append(event)
+        self.events[id(event)] = event
+        self.by_activation.setdefault(event.activation_type, {})[id(event)] = event
+        self._index(event.get_position, event)
+        # events with a fixed position take part in the collisions of their tile
+        self.world.occupy(event.position, event)
+        self.world.mark_events_dirty()
 
     def remove_event(self, event):
-        if event.position in self.events:
-            del self.events[event.position]
+        if id(event) in self.events:
+            del self.events[id(event)]
+            self.by_activation.get(event.activation_type, {}).pop(id(event), None)
+            self._unindex(event.get_position, event)
+            self.world.vacate(event.position, event)
+            self.world.mark_events_dirty()
+
+    def clear(self):
+        self.events = {}
+        self.by_position = {}
+        self.by_activation = {activation_type: {} for activation_type in ACTIVATION_TYPES}
+        self.world.mark_events_dirty()
+
+    def relocate(self, event, old_position, new_position):
+        """Called when the entity holding the event moves"""
+        if id(event) in self.events:
+            self._unindex(old_position, event)
+            self._index(new_position, event)
+
+    def move_event(self, event, position):
+        """Give a new fixed position to an event, used by `event.position = position`"""
+        old_index, old_position = event.get_position, event.position
+        object.__setattr__(event, "position", position)
+        if id(event) in self.events:
+            self._unindex(old_index, event)
+            self._index(event.get_position, event)
+            self.world.vacate(old_position, event)
+            self.world.occupy(position, event)
+
+    def _index(self, position, event):
+        if position is not None:
+            self.by_position.setdefault(tuple(position), []).append(event)
+
+    def _unindex(self, position, event):
+        if position is None:
+            return
+        position = tuple(position)
+        events = self.by_position.get(position)
+        if events and event in events:
+            events.remove(event)
+            if not events:
+                del self.by_position[position]
 
     def get_event(self, position):
-        for event in self.events:
-            if event.position == position:
-                return event
-        return None
+        events = self.by_position.get(tuple(position))
+        return events[0] if events else None
+
+    def get_events_at(self, position, activation_type=None):
+        return [event for event in self.by_position.get(tuple(position), ())
+                if activation_type is None or event.activation_type == activation_type]
 
     def update(self, player, action):
-        for event in self.events:
+        # copies are used as an activation can add or remove events (or change the world)
+        candidates = self.get_events_at(player.get_position(), "ON_STEP")
+        if action == "INTERACT":
+            candidates += self.get_events_at(player.facing_position(), "ON_INTERACT")
+        elif action in MOVEMENT_ACTIONS:
+            candidates += list(self.by_activation["ALWAYS"].values())
+        for event in candidates:
             if event.should_trigger(action):
                 event.activation()
@@ -33,7 +33,7 @@ def exploration_input(universe, key):
             ...
         universe.mode_change(key.lower())
     elif key == "QUIT":
-        universe.save_save()
+        universe.save_save(wait=True)
         exit()
 
 
@@ -45,15 +45,8 @@ def exploration_input(universe, key):
 
 def dialogue_input(universe, key):
     if dialogue_system.state == "TEXT_CHUNK":
-        if dialogue_system.current_dialogue == "":
-            if dialogue_system.as_choices():
-                dialogue_system.state = "CHOICE"
-                dialogue_system.set_choices()
-            else:
-                dialogue_system.state = "NEXT_LINE"
-
         if key == "INTERACT":
-            ...
+            dialogue_system.next_page()
     elif dialogue_system.state == "CHOICE":
         if isinstance(key, int):  # renvoie d'un chiffre via le mapping
             if 1 <= key <= len(dialogue_system.choices):
@@ -43,6 +43,7 @@ class ItemsListRenderer:
         self.focused = False
         self.current_index = 0
         self.name = ""
+        self.version = 0  # changes with each set_list, the UI keeps the drawn pages until then
 
     def get_item(self, key):
         # Accept int or single-char str: '0'-'9' -> 0-9, 'a'-'z'/'A'-'Z' -> 10-35 (base36-like)
@@ -71,6 +72,7 @@ class ItemsListRenderer:
             self.items_ids.append(k)
         self.current_index = 0
         self.name = name
+        self.version += 1
 
 
 item_list_renderer = ItemsListRenderer()
@@ -90,11 +92,24 @@ class Inventory:
             "special": ""
         }
 
+    def __setattr__(self, key, value):
+        object.__setattr__(self, key, value)
+        if key != "dirty":
+            self.mark_dirty()
+
+    def mark_dirty(self):
+        """Changed since the last save, to call after changing items or equipment in place"""
+        self.__dict__["dirty"] = True
+        on_change = self.__dict__.get("on_change")  # set by the player, records the change in the save journal
+        if on_change is not None:
+            on_change()
+
     def add_item(self, item_id, quantity=1):
         if item_id in self.items:
             self.items[item_id] += quantity
         else:
             self.items[item_id] = quantity
+        self.mark_dirty()
 
     def remove_item(self, item_id, quantity=1):
         if item_id in self.items:
@@ -107,6 +122,7 @@ class Inventory:
                     self.items[item_id]["quantity"] -= quantity
                     if self.items[item_id] <= 0:
                         del self.items[item_id]
+            self.mark_dirty()
 
     def get_quantity(self, item_id):
         item = self.items.get(item_id, 0)
@@ -122,7 +138,8 @@ class Inventory:
     def export_data(self):
         data = {}
         for k, v in self.__dict__.items():
-            data[k] = v
+            if k not in ("dirty", "on_change"):
+                data[k] = v
         return data
     def load_data(self, data):
         self.items = data.get("items", {})
@@ -171,6 +188,7 @@ class DealItem:
                 if item_type == "equipment":
                     slot = get_item_part(self.item_id, "position")
                     self.inventory_a.equipment[slot] = self.item_id
+                    self.inventory_a.mark_dirty()
                 # For other item types, implement their effects here
                 elif item_type == "consumable":
                     ...
@@ -0,0 +1,260 @@
+from array import array
+from collections import OrderedDict
+import mmap
+import os
+
+from engine.core.TextWidth import char_width, pad_wide
+
+VOID = ""  # padding for the rows shorter than the map width, never walkable
+DEFAULT_WALKABLE_TILES = ('.', ',', ';', ':', '*', ' ')
+
+# maps bigger than this are not read at once but by bands of CHUNK_ROWS rows
+LARGE_MAP_BYTES = 256 * 1024
+CHUNK_ROWS = 64
+
+# parsed maps shared by every world of the process : path -> ((mtime, size), MapLayout), least recently used first
+MAP_CACHE_SIZE = 32
+_layout_cache = OrderedDict()
+
+
+def read_map_rows(path):
+    with open(path, 'r', encoding='utf-8') as file:
+        return [line.rstrip('\n') for line in file]
+
+
+def load_layout(path):
+    """
+    Parsed map of the file, read and parsed only once while the file does not change.
+    The returned MapLayout is shared, it must not be modified.
+    """
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    key = os.path.abspath(path)
+    entry = _layout_cache.get(key)
+    if entry is not None and entry[0] == stamp:
+        _layout_cache.move_to_end(key)
+        return entry[1]
+    layout = MapLayout(read_map_rows(path))
+    _layout_cache[key] = (stamp, layout)
+    _layout_cache.move_to_end(key)
+    while len(_layout_cache) > MAP_CACHE_SIZE:
+        _layout_cache.popitem(last=False)
+    return layout
+
+
+def clear_map_cache():
+    _layout_cache.clear()
+
+
+class MapLayout:
+    """
+    Parsed map, it never changes once built so it can be shared between worlds.
+    Each distinct character gets a code in `palette` and `cells` holds one code per tile,
+    row by row, in a bytes object (or a 16 bits array if the map uses more than 256 characters).
+    A tile is a terminal column : the rows get a PAD tile after each wide character (see TextWidth.py).
+    """
+    def __init__(self, rows):
+        rows = [pad_wide(row) for row in rows]
+        self.height = len(rows)
+        self.width = max((len(row) for row in rows), default=0)
+        self.row_lengths = memoryview(array('I', (len(row) for row in rows))).toreadonly()
+
+        codes = {VOID: 0}
+        palette = [VOID]
+        for row in rows:
+            for char in row:
+                if char not in codes:
+                    codes[char] = len(palette)
+                    palette.append(char)
+        self.palette = tuple(palette)
+
+        self.code_size = 1 if len(palette) <= 256 else 2  # bytes per cell
+        if self.code_size == 1:
+            translation = {ord(char): code for char, code in codes.items() if char}
+            self.cells = b"".join(row.ljust(self.width, "\0").translate(translation).encode("latin-1")
+                                  for row in rows)
+            # code -> character, used to turn a row back into text
+            self._decode = {code: char for code, char in enumerate(palette)}
+        else:
+            cells = array('H', bytes(2 * self.width * self.height))
+            for y, row in enumerate(rows):
+                for x, char in enumerate(row):
+                    cells[y * self.width + x] = codes[char]
+            self.cells = memoryview(cells).toreadonly()
+            self._decode = None
+        self.walkable = None  # no precomputed walkability bitmap
+        self._display_widths = None
+
+    @classmethod
+    def from_buffers(cls, height, width, palette, row_lengths, cells, display_widths=None, walkable=None):
+        """
+        Build a layout from already encoded buffers (e.g. a memory-mapped map pack), without any parsing.
+        `walkable` is an optional (walkable_tiles, bitmap) couple precomputed for those tiles.
+        """
+        layout = cls.__new__(cls)
+        layout.height = height
+        layout.width = width
+        layout.palette = tuple(palette)
+        layout.row_lengths = row_lengths
+        layout.cells = cells
+        layout.code_size = 1 if len(palette) <= 256 else 2
+        layout._decode = {code: char for code, char in enumerate(palette)} if layout.code_size == 1 else None
+        layout.walkable = walkable
+        layout._display_widths = tuple(display_widths) if display_widths is not None else None
+        return layout
+
+    @property
+    def display_widths(self):
+        """Terminal columns taken by each palette entry"""
+        if self._display_widths is None:
+            self._display_widths = tuple(char_width(char) for char in self.palette)
+        return self._display_widths
+
+    def in_bounds(self, y, x):
+        return 0 <= y < self.height and 0 <= x < self.row_lengths[y]
+
+    def cell(self, y, x):
+        return self.palette[self.cells[y * self.width + x]]
+
+    def row_text(self, y, start=0, stop=None):
+        length = self.row_lengths[y]
+        stop = length if stop is None else min(stop, length)
+        if start >= stop:
+            return ""
+        begin = y * self.width
+        chunk = self.cells[begin + start:begin + stop]
+        if self._decode is not None:
+            return bytes(chunk).decode("latin-1").translate(self._decode)
+        return "".join(self.palette[code] for code in chunk)
+
+
+class MapGrid:
+    """
+    Map of a world : a shared MapLayout plus the walkability bitmap of the world (1 bit per tile),
+    rebuilt from the walkable characters only when they change.
+    """
+    def __init__(self, layout, walkable_tiles):
+        self.layout = layout
+        self.walkable = b""
+        self.set_walkable_tiles(walkable_tiles)
+
+    @property
+    def height(self):
+        return self.layout.height
+
+    @property
+    def width(self):
+        return self.layout.width
+
+    def set_walkable_tiles(self, walkable_tiles):
+        layout = self.layout
+        if layout.walkable is not None and tuple(walkable_tiles) == tuple(layout.walkable[0]):
+            self.walkable = layout.walkable[1]  # precomputed by the map compiler
+            return
+        flags = [b"1" if char != VOID and char in walkable_tiles else b"0" for char in layout.palette]
+        if layout.code_size == 1:
+            table = b"".join(flags).ljust(256, b"0")
+            digits = bytes(layout.cells).translate(table)
+        else:
+            digits = b"".join(flags[code] for code in layout.cells)
+        count = len(digits)
+        # bit i of the bitmap is the tile i, hence the reversed digits
+        self.walkable = int(digits[::-1], 2).to_bytes((count + 7) // 8, "little") if count else b""
+
+    def is_walkable(self, y, x):
+        if not self.layout.in_bounds(y, x):
+            return False  # en dehors des limites de la carte
+        index = y * self.layout.width + x
+        return bool(self.walkable[index >> 3] >> (index & 7) & 1)
+
+    def cell(self, y, x):
+        return self.layout.cell(y, x)
+
+    def row_text(self, y, start=0, stop=None):
+        return self.layout.row_text(y, start, stop)
+
+    def rows(self):
+        return [self.layout.row_text(y) for y in range(self.layout.height)]
+
+    def focus(self, y, x):
+        """The whole map is in memory, nothing to load or evict"""
+
+
+class ChunkedMapGrid:
+    """
+    Same interface as MapGrid for maps too big to be kept in memory.
+    The file is memory-mapped and only the offsets of the lines are read when it is opened,
+    then the map is parsed by bands of `chunk_rows` rows when a tile of the band is needed.
+    `focus` (called when the player moves) evicts the bands that are far from the player.
+    """
+    def __init__(self, path, walkable_tiles, chunk_rows=CHUNK_ROWS, keep_radius=2, max_chunks=16):
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self.keep_radius = keep_radius  # bands kept around the band of the player
+        self.max_chunks = max_chunks  # hard limit, least recently used bands go first
+        self.walkable_tiles = tuple(walkable_tiles)
+        self.chunks = OrderedDict()  # band index -> MapGrid
+
+        with open(path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            self._mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self.line_starts = array('Q')
+        self.width = 0  # in tiles (terminal columns), like MapLayout.width
+        position = 0
+        end = len(self._mm)
+        while position < end:
+            self.line_starts.append(position)
+            newline = self._mm.find(b"\n", position)
+            position = end if newline == -1 else newline + 1
+            line = self._mm[self.line_starts[-1]:end if newline == -1 else newline].rstrip(b"\r")
+            # ascii rows have one tile per byte, the others are decoded to count their wide characters
+            width = len(line) if line.isascii() else len(pad_wide(line.decode("utf-8")))
+            if width > self.width:
+                self.width = width
+        # sentinel : start of the line after the last one, as if the file ended by a new line
+        self.line_starts.append(end if self._mm[end - 1:end] == b"\n" else end + 1)
+
+        self.height = len(self.line_starts) - 1
+
+    def _read_rows(self, first, last):
+        end = len(self._mm)
+        return [self._mm[self.line_starts[y]:min(self.line_starts[y + 1] - 1, end)].decode("utf-8").rstrip("\r")
+                for y in range(first, last)]
+
+    def _chunk(self, y):
+        index = y // self.chunk_rows
+        grid = self.chunks.get(index)
+        if grid is None:
+            first = index * self.chunk_rows
+            rows = self._read_rows(first, min(first + self.chunk_rows, self.height))
+            grid = MapGrid(MapLayout(rows), self.walkable_tiles)
+            self.chunks[index] = grid
+            while len(self.chunks) > self.max_chunks:
+                self.chunks.popitem(last=False)
+        else:
+            self.chunks.move_to_end(index)
+        return grid
+
+    def set_walkable_tiles(self, walkable_tiles):
+        self.walkable_tiles = tuple(walkable_tiles)
+        for grid in self.chunks.values():
+            grid.set_walkable_tiles(self.walkable_tiles)
+
+    def is_walkable(self, y, x):
+        if not 0 <= y < self.height:
+            return False
+        return self._chunk(y).is_walkable(y % self.chunk_rows, x)
+
+    def cell(self, y, x):
+        return self._chunk(y).cell(y % self.chunk_rows, x)
+
+    def row_text(self, y, start=0, stop=None):
+        return self._chunk(y).row_text(y % self.chunk_rows, start, stop)
+
+    def rows(self):
+        return [self.row_text(y) for y in range(self.height)]
+
+    def focus(self, y, x):
+        center = y // self.chunk_rows
+        for index in [index for index in self.chunks if abs(index - center) > self.keep_radius]:
+            del self.chunks[index]
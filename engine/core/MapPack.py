@@ -0,0 +1,166 @@
+"""
+Binary map pack made by engine/compile_maps.py from the assets/maps/*.txt files.
+The pack is memory-mapped, a World loaded from it does not read nor parse any text.
+
+Layout of the file (little endian):
+    header   : MAGIC, version (u16), number of maps (u32)
+    index    : for each map, path length (u16), path (utf-8), source mtime_ns (u64), source size (u64), block offset (u64)
+    block    : height (u32), width (u32), palette size (u32), walkable tiles size (u32)
+               palette (for each character : length (u8) + utf-8), display width of each palette entry (u8 each),
+               walkable tiles (utf-8, "\0" separated), padding to 4 bytes,
+               row lengths (u32 each), cells (u8 each, u16 if more than 256 characters), padding to 4 bytes,
+               walkability bitmap of the walkable tiles (1 bit per cell)
+"""
+from array import array
+import mmap
+import os
+import struct
+
+from engine.core.logging_setup import logger
+from engine.core.MapGrid import MapGrid, MapLayout, read_map_rows
+
+MAGIC = b"BSMPACK\0"
+PACK_VERSION = 2  # 2 : wide characters are followed by a PAD tile
+DEFAULT_PACK_PATH = "assets/maps/maps.pack"
+
+_HEADER = struct.Struct("<8sHI")
+_INDEX_ENTRY = struct.Struct("<QQQ")
+_BLOCK_HEADER = struct.Struct("<IIII")
+
+
+def _pad4(buffer):
+    buffer.extend(b"\0" * (-len(buffer) % 4))
+
+
+def encode_map(layout, walkable_tiles):
+    """Binary block of a parsed map, see the module docstring"""
+    bitmap = MapGrid(layout, walkable_tiles).walkable
+    tiles = "\0".join(walkable_tiles).encode("utf-8")
+    block = bytearray(_BLOCK_HEADER.pack(layout.height, layout.width, len(layout.palette), len(tiles)))
+    for char in layout.palette:
+        encoded = char.encode("utf-8")
+        block += bytes((len(encoded),)) + encoded
+    block += bytes(layout.display_widths)
+    block += tiles
+    _pad4(block)
+    block += array('I', layout.row_lengths).tobytes()
+    block += bytes(layout.cells)
+    _pad4(block)
+    block += bitmap
+    return bytes(block)
+
+
+def write_pack(path, sources, walkable_tiles):
+    """
+    Parse every map of `sources` and write them in a pack at `path`.
+    The walkability bitmaps are precomputed for `walkable_tiles`.
+    """
+    blocks = []
+    index = bytearray()
+    for source in sources:
+        stat = os.stat(source)
+        layout = MapLayout(read_map_rows(source))
+        blocks.append((os.path.normpath(source), stat, encode_map(layout, walkable_tiles)))
+    offset = _HEADER.size + sum(2 + len(name.encode("utf-8")) + _INDEX_ENTRY.size for name, _, _ in blocks)
+    offset += -offset % 4
+    for name, stat, block in blocks:
+        encoded = name.encode("utf-8")
+        index += struct.pack("<H", len(encoded)) + encoded + _INDEX_ENTRY.pack(stat.st_mtime_ns, stat.st_size, offset)
+        offset += len(block) + (-len(block) % 4)
+
+    data = bytearray(_HEADER.pack(MAGIC, PACK_VERSION, len(blocks)))
+    data += index
+    _pad4(data)
+    for _, _, block in blocks:
+        data += block
+        _pad4(data)
+
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as file:
+        file.write(data)
+    os.replace(temp_path, path)
+
+
+class MapPack:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as file:
+            self._mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mm)
+        self.entries = {}  # source path -> (mtime_ns, size, offset)
+        self.layouts = {}  # source path -> MapLayout, built on first use
+
+        magic, version, count = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != PACK_VERSION:
+            raise ValueError(f"{path} n'est pas un pack de maps version {PACK_VERSION}")
+        position = _HEADER.size
+        for _ in range(count):
+            (length,) = struct.unpack_from("<H", self._mm, position)
+            name = self._mm[position + 2:position + 2 + length].decode("utf-8")
+            position += 2 + length
+            self.entries[name] = _INDEX_ENTRY.unpack_from(self._mm, position)
+            position += _INDEX_ENTRY.size
+
+    def get_layout(self, source):
+        """Layout of the map compiled from `source`, None if it is not in the pack or if the source changed since"""
+        source = os.path.normpath(source)
+        entry = self.entries.get(source)
+        if entry is None:
+            return None
+        mtime_ns, size, offset = entry
+        if os.path.exists(source):
+            stat = os.stat(source)
+            if (stat.st_mtime_ns, stat.st_size) != (mtime_ns, size):
+                logger.info(f"Map {source} modifiée depuis la compilation du pack, lecture du fichier texte.")
+                return None
+        if source not in self.layouts:
+            self.layouts[source] = self._decode_block(offset)
+        return self.layouts[source]
+
+    def _decode_block(self, offset):
+        height, width, palette_size, tiles_size = _BLOCK_HEADER.unpack_from(self._mm, offset)
+        position = offset + _BLOCK_HEADER.size
+        palette = []
+        for _ in range(palette_size):
+            length = self._mm[position]
+            palette.append(self._mm[position + 1:position + 1 + length].decode("utf-8"))
+            position += 1 + length
+        display_widths = self._mm[position:position + palette_size]
+        position += palette_size
+        tiles = self._mm[position:position + tiles_size].decode("utf-8")
+        walkable_tiles = tuple(tiles.split("\0")) if tiles else ()
+        position += tiles_size
+        position += -position % 4
+
+        row_lengths = self._view[position:position + 4 * height].cast("I")
+        position += 4 * height
+        code_size = 1 if palette_size <= 256 else 2
+        cells = self._view[position:position + code_size * height * width]
+        if code_size == 2:
+            cells = cells.cast("H")
+        position += code_size * height * width
+        position += -position % 4
+        bitmap = self._view[position:position + (height * width + 7) // 8]
+        return MapLayout.from_buffers(height, width, palette, row_lengths, cells, display_widths, (walkable_tiles, bitmap))
+
+
+_pack = None
+_pack_stamp = None
+
+
+def load_packed_layout(source, pack_path=DEFAULT_PACK_PATH):
+    """Layout of a map from the compiled pack if there is an up to date one, None otherwise"""
+    global _pack, _pack_stamp
+    try:
+        stat = os.stat(pack_path)
+    except OSError:
+        return None
+    stamp = (pack_path, stat.st_mtime_ns, stat.st_size)
+    if stamp != _pack_stamp:
+        try:
+            _pack = MapPack(pack_path)
+        except (OSError, ValueError, struct.error) as e:
+            logger.warning(f"Pack de maps {pack_path} illisible, les maps seront lues en texte : {e}")
+            _pack = None
+        _pack_stamp = stamp
+    return _pack.get_layout(source) if _pack is not None else None
@@ -0,0 +1,106 @@
+from collections import OrderedDict, deque
+import heapq
+
+NEIGHBOURS = ((-1, 0), (1, 0), (0, -1), (0, 1))  # UP, DOWN, LEFT, RIGHT, same order as the inputs
+
+
+class PathFinder:
+    """
+    Pathfinding service of a world, on the walkability of its tiles.
+    - find_path : A* between two tiles, taking every occupant into account, with a budget of explored tiles.
+    - next_step : one step toward a target using a distance field. The fields are computed once per target
+      (the player, a door...) on the terrain only, i.e. the map, the events and the entities that never move,
+      and shared by every entity going there. The moving entities are only checked for the chosen step,
+      so dozens of entities can re-path every tick without recomputing anything.
+    The fields are thrown away when World.terrain_version changes (map, walkable tiles or static occupants).
+    """
+    def __init__(self, world, max_fields=8, field_radius=64, max_nodes=4096):
+        self.world = world
+        self.max_fields = max_fields  # number of targets whose field is kept, least recently used first out
+        self.field_radius = field_radius  # the fields stop at this distance from their target
+        self.max_nodes = max_nodes  # tiles explored at most by find_path
+        self.fields = OrderedDict()  # target -> distances {tile: steps to the target}
+        self.version = world.terrain_version
+
+    def _check_version(self):
+        if self.version != self.world.terrain_version:
+            self.fields.clear()
+            self.version = self.world.terrain_version
+
+    def distance_field(self, target):
+        self._check_version()
+        target = tuple(target)
+        field = self.fields.get(target)
+        if field is not None:
+            self.fields.move_to_end(target)
+            return field
+
+        field = {target: 0}
+        queue = deque((target,))
+        while queue:
+            tile = queue.popleft()
+            distance = field[tile] + 1
+            if distance > self.field_radius:
+                continue
+            y, x = tile
+            for dy, dx in NEIGHBOURS:
+                neighbour = (y + dy, x + dx)
+                if neighbour not in field and self.world.is_walkable(neighbour, include_movable=False):
+                    field[neighbour] = distance
+                    queue.append(neighbour)
+
+        self.fields[target] = field
+        while len(self.fields) > self.max_fields:
+            self.fields.popitem(last=False)
+        return field
+
+    def next_step(self, start, target):
+        """Next tile to go from start toward target, None if already next to it, too far or stuck"""
+        field = self.distance_field(target)
+        start = tuple(start)
+        current = field.get(start)
+        if current is None or current <= 1:
+            return None
+        y, x = start
+        for dy, dx in NEIGHBOURS:
+            neighbour = (y + dy, x + dx)
+            if field.get(neighbour, current) < current and self.world.is_walkable(neighbour):
+                return neighbour
+        return None
+
+    def find_path(self, start, goal, max_nodes=None):
+        """
+        Tiles to walk through from start to goal (start excluded, goal included), None if there is no path
+        within the budget. The goal itself may be occupied (e.g. to walk to the player).
+        """
+        start, goal = tuple(start), tuple(goal)
+        max_nodes = max_nodes or self.max_nodes
+
+        def heuristic(tile):
+            return abs(tile[0] - goal[0]) + abs(tile[1] - goal[1])
+
+        came_from = {start: None}
+        costs = {start: 0}
+        frontier = [(heuristic(start), 0, start)]
+        explored = 0
+        while frontier and explored < max_nodes:
+            _, cost, tile = heapq.heappop(frontier)
+            if tile == goal:
+                path = []
+                while tile != start:
+                    path.append(tile)
+                    tile = came_from[tile]
+                return path[::-1]
+            if cost > costs[tile]:
+                continue  # already reached with a shorter path
+            explored += 1
+            y, x = tile
+            for dy, dx in NEIGHBOURS:
+                neighbour = (y + dy, x + dx)
+                if neighbour != goal and not self.world.is_walkable(neighbour):
+                    continue
+                if cost + 1 < costs.get(neighbour, cost + 2):
+                    costs[neighbour] = cost + 1
+                    came_from[neighbour] = tile
+                    heapq.heappush(frontier, (cost + 1 + heuristic(neighbour), cost + 1, neighbour))
+        return None
@@ -0,0 +1,319 @@
+"""
+Formats of the save files. A codec turns the save data (JSON-like values : dict, list, str, int, float, bool, None)
+into bytes, and can build an object from values it already encoded, so the saves only encode what changed :
+    encode(value)           bytes of a value
+    entry(key, fragment)    bytes of a key and of its already encoded value
+    join(entries)           bytes of an object from entries
+    document(parts)         whole file from (key, encoded value) couples, with the schema version in its header
+    decode(fragment)        value of encode()
+    load(data)              save data of a whole file, after checking its schema version
+
+- JsonCodec : UTF-8 JSON, the schema version is the "__schema__" key. Files without it are from before the
+  codecs, they have the layout of version 1.
+- BinaryCodec : "BSAV", schema version and flags, then the data in the MessagePack format, zlib-compressed
+  by default. Smaller and faster to write than JSON for big universes, not readable in a text editor.
+load_document(data) finds the codec of a file by itself.
+"""
+import json
+import os
+import struct
+import zlib
+
+# layout of the save data, raise it (and convert the old data when it is loaded) when it changes
+# 1 : every scene in the universe file, 2 : the universe file lists the scenes, each one has its own file
+SCHEMA_VERSION = 2
+
+
+def check_schema(version):
+    if not isinstance(version, int) or version > SCHEMA_VERSION:
+        raise ValueError(f"Sauvegarde au format {version}, ce moteur ne lit que les formats <= {SCHEMA_VERSION}")
+
+
+class JsonCodec:
+    name = "json"
+    extension = ".json"
+
+    def encode(self, value):
+        return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+    def entry(self, key, fragment):
+        return json.dumps(key, ensure_ascii=False).encode("utf-8") + b": " + fragment
+
+    def join(self, entries):
+        return b"{" + b", ".join(entries) + b"}"
+
+    def object(self, parts):
+        return self.join([self.entry(key, fragment) for key, fragment in parts])
+
+    def document(self, parts):
+        return self.object([("__schema__", self.encode(SCHEMA_VERSION))] + list(parts))
+
+    def decode(self, fragment):
+        return json.loads(fragment)
+
+    def load(self, data):
+        document = json.loads(data)
+        check_schema(document.pop("__schema__", 1))
+        return document
+
+
+# MessagePack type bytes
+_NIL, _FALSE, _TRUE = b"\xc0", b"\xc2", b"\xc3"
+_FIXINT = [bytes((i,)) for i in range(128)]
+_FIXSTR = [bytes((0xa0 | i,)) for i in range(32)]
+_FIXARRAY = [bytes((0x90 | i,)) for i in range(16)]
+_FIXMAP = [bytes((0x80 | i,)) for i in range(16)]
+_pack = struct.pack
+_unpack_from = struct.unpack_from
+
+
+def _json_key(key):
+    """Keys are saved as strings, like json.dumps does"""
+    if key is True:
+        return "true"
+    if key is False:
+        return "false"
+    if key is None:
+        return "null"
+    if isinstance(key, int):
+        return int.__repr__(key)
+    if isinstance(key, float):
+        return json.dumps(key)
+    raise TypeError(f"keys must be str, int, float, bool or None, not {type(key).__name__}")
+
+
+def _str_header(size):
+    if size < 32:
+        return _FIXSTR[size]
+    if size < 0x100:
+        return b"\xd9" + bytes((size,))
+    if size < 0x10000:
+        return _pack(">BH", 0xda, size)
+    return _pack(">BI", 0xdb, size)
+
+
+def _array_header(size):
+    if size < 16:
+        return _FIXARRAY[size]
+    if size < 0x10000:
+        return _pack(">BH", 0xdc, size)
+    return _pack(">BI", 0xdd, size)
+
+
+def _map_header(size):
+    if size < 16:
+        return _FIXMAP[size]
+    if size < 0x10000:
+        return _pack(">BH", 0xde, size)
+    return _pack(">BI", 0xdf, size)
+
+
+def _encode_int(value):
+    if 0 <= value < 128:
+        return _FIXINT[value]
+    if -32 <= value < 0:
+        return bytes((value & 0xff,))
+    if value >= 0:
+        if value < 0x100:
+            return _pack(">BB", 0xcc, value)
+        if value < 0x10000:
+            return _pack(">BH", 0xcd, value)
+        if value < 0x100000000:
+            return _pack(">BI", 0xce, value)
+        if value < 0x10000000000000000:
+            return _pack(">BQ", 0xcf, value)
+    elif value >= -0x8000000000000000:
+        if value >= -0x80:
+            return _pack(">Bb", 0xd0, value)
+        if value >= -0x8000:
+            return _pack(">Bh", 0xd1, value)
+        if value >= -0x80000000:
+            return _pack(">Bi", 0xd2, value)
+        return _pack(">Bq", 0xd3, value)
+    raise ValueError(f"Entier trop grand pour le format binaire : {value}")
+
+
+def _encode(value, out):
+    kind = type(value)
+    if kind is str:
+        data = value.encode("utf-8")
+        out.append(_str_header(len(data)))
+        out.append(data)
+    elif kind is int:
+        out.append(_encode_int(value))
+    elif kind is dict:
+        out.append(_map_header(len(value)))
+        for key, item in value.items():
+            _encode(key if type(key) is str else _json_key(key), out)
+            _encode(item, out)
+    elif kind is list or kind is tuple:
+        out.append(_array_header(len(value)))
+        for item in value:
+            _encode(item, out)
+    elif value is None:
+        out.append(_NIL)
+    elif value is True:
+        out.append(_TRUE)
+    elif value is False:
+        out.append(_FALSE)
+    elif kind is float:
+        out.append(_pack(">Bd", 0xcb, value))
+    # subclasses (OrderedDict, IntEnum...) are saved like their base type, as json does
+    elif isinstance(value, str):
+        _encode(str(value), out)
+    elif isinstance(value, int):
+        out.append(_encode_int(int(value)))
+    elif isinstance(value, float):
+        _encode(float(value), out)
+    elif isinstance(value, dict):
+        _encode(dict(value), out)
+    elif isinstance(value, (list, tuple)):
+        _encode(list(value), out)
+    else:
+        raise TypeError(f"Object of type {kind.__name__} is not serializable")
+
+
+def _decode(data, position):
+    """(value, position after it) of the value that starts at position"""
+    tag = data[position]
+    position += 1
+    if tag < 0x80:
+        return tag, position
+    if 0xa0 <= tag <= 0xbf:
+        end = position + (tag & 0x1f)
+        return data[position:end].decode("utf-8"), end
+    if 0x80 <= tag <= 0x8f:
+        return _decode_map(data, position, tag & 0x0f)
+    if 0x90 <= tag <= 0x9f:
+        return _decode_array(data, position, tag & 0x0f)
+    if tag >= 0xe0:
+        return tag - 0x100, position
+    if tag == 0xc0:
+        return None, position
+    if tag == 0xc2:
+        return False, position
+    if tag == 0xc3:
+        return True, position
+    if tag == 0xcb:
+        return _unpack_from(">d", data, position)[0], position + 8
+    if tag in _STR_SIZES:
+        size_format, size_length = _STR_SIZES[tag]
+        end = position + size_length + _unpack_from(size_format, data, position)[0]
+        return data[position + size_length:end].decode("utf-8"), end
+    if tag in _NUMBERS:
+        number_format, length = _NUMBERS[tag]
+        return _unpack_from(number_format, data, position)[0], position + length
+    if tag in (0xdc, 0xdd, 0xde, 0xdf):
+        size_format, size_length = (">H", 2) if tag in (0xdc, 0xde) else (">I", 4)
+        size = _unpack_from(size_format, data, position)[0]
+        if tag in (0xdc, 0xdd):
+            return _decode_array(data, position + size_length, size)
+        return _decode_map(data, position + size_length, size)
+    raise ValueError(f"Donnée binaire invalide (type 0x{tag:02x} à l'octet {position - 1})")
+
+
+_STR_SIZES = {0xd9: (">B", 1), 0xda: (">H", 2), 0xdb: (">I", 4)}
+_NUMBERS = {0xcc: (">B", 1), 0xcd: (">H", 2), 0xce: (">I", 4), 0xcf: (">Q", 8),
+            0xd0: (">b", 1), 0xd1: (">h", 2), 0xd2: (">i", 4), 0xd3: (">q", 8), 0xca: (">f", 4)}
+
+
+def _decode_array(data, position, size):
+    items = []
+    for _ in range(size):
+        item, position = _decode(data, position)
+        items.append(item)
+    return items, position
+
+
+def _decode_map(data, position, size):
+    items = {}
+    for _ in range(size):
+        key, position = _decode(data, position)
+        items[key], position = _decode(data, position)
+    return items, position
+
+
+class BinaryCodec:
+    name = "binary"
+    extension = ".sav"
+    MAGIC = b"BSAV"
+    COMPRESSED = 1  # flag of the header
+
+    def __init__(self, compress=True, level=6):
+        self.compress = compress
+        self.level = level
+
+    def encode(self, value):
+        out = []
+        _encode(value, out)
+        return b"".join(out)
+
+    def entry(self, key, fragment):
+        return self.encode(key) + fragment
+
+    def join(self, entries):
+        return _map_header(len(entries)) + b"".join(entries)
+
+    def object(self, parts):
+        return self.join([self.entry(key, fragment) for key, fragment in parts])
+
+    def document(self, parts):
+        body = self.object(parts)
+        flags = 0
+        if self.compress:
+            body = zlib.compress(body, self.level)
+            flags |= self.COMPRESSED
+        return self.MAGIC + _pack("<HB", SCHEMA_VERSION, flags) + body
+
+    def decode(self, fragment):
+        value, position = _decode(fragment, 0)
+        if position != len(fragment):
+            raise ValueError("Donnée binaire invalide (octets en trop)")
+        return value
+
+    def load(self, data):
+        if not data.startswith(self.MAGIC):
+            raise ValueError("Ce n'est pas une sauvegarde binaire")
+        version, flags = struct.unpack_from("<HB", data, len(self.MAGIC))
+        check_schema(version)
+        body = data[len(self.MAGIC) + 3:]
+        if flags & self.COMPRESSED:
+            body = zlib.decompress(body)
+        return self.decode(body)
+
+
+CODECS = {
+    "json": JsonCodec,
+    "binary": BinaryCodec,
+}
+
+
+def get_codec(codec):
+    """Codec instance from its name in CODECS, or the instance itself"""
+    if isinstance(codec, str):
+        if codec not in CODECS:
+            raise ValueError(f"Format de sauvegarde inconnu : {codec} (choix : {', '.join(CODECS)})")
+        return CODECS[codec]()
+    return codec
+
+
+def sniff_codec(data):
+    """Codec that can read these bytes of a save file"""
+    return BinaryCodec() if data.startswith(BinaryCodec.MAGIC) else JsonCodec()
+
+
+def load_document(data):
+    return sniff_codec(data).load(data)
+
+
+def find_save(path):
+    """Save file of path (without extension) in any format, the most recent one if there are several, or None"""
+    candidates = [path + codec.extension for codec in CODECS.values()]
+    candidates = [candidate for candidate in candidates if os.path.isfile(candidate)]
+    return max(candidates, key=os.path.getmtime, default=None)
+
+
+def read_save(path):
+    """Save data of a file, whatever its format"""
+    with open(path, "rb") as file:
+        return load_document(file.read())
@@ -0,0 +1,190 @@
+"""
+Journal of the changes made between two saves, so a crash only loses what happened in the last instant and not
+everything since the last save. Each change is one JSON line appended to saves/<universe>/journal/<n>.log :
+    ["move", scene, entity, [y, x]]       an entity of a scene moved
+    ["player", [y, x]]                    the player moved
+    ["world", scene]                      the player entered another scene
+    ["inventory", data]                   the player inventory changed (Inventory.export_data())
+    ["ext", "universe" | "player", key, value]    a flag of the ext_data of the universe or of the player
+Every record holds the new value, not a difference, so replaying a record twice changes nothing.
+
+Each save (UniverseData.save_save) starts a new segment of the journal and records its number in the universe
+file : the segments before it are in the save, they are deleted once the universe file is written.
+UniverseData.load_save replays the segments that are not in the save on top of it. Past max_records records,
+the journal saves the universe by itself (in the background, see SaveWriter.py) to start again from a new save.
+The moves of the scenes that are not built yet (see UniverseData.stored_scenes) are kept until the player enters
+them, and carried over to each new segment until then.
+"""
+import json
+import os
+
+from engine.core.logging_setup import logger
+
+
+class SaveJournal:
+    def __init__(self, universe, max_records=5000):
+        self.universe = universe
+        self.max_records = max_records  # past this number of records since the last save, the universe is saved
+        self.segment = 0  # number of the segment the records are appended to
+        self.file = None  # opened at the first record of the segment
+        self.records = 0  # records since the last save (replayed ones included)
+        self.recording = False  # nothing is recorded while the universe is loaded or a scene is restored
+        self.pending_moves = {}  # scene name -> {entity name: position}, for the scenes not built yet
+
+    def folder(self):
+        return "saves/{}/journal".format(self.universe.name)
+
+    def segment_path(self, segment):
+        return os.path.join(self.folder(), f"{segment}.log")
+
+    def segments(self):
+        """Numbers of the segments on the disk, in order"""
+        if not os.path.isdir(self.folder()):
+            return []
+        return sorted(int(name[:-4]) for name in os.listdir(self.folder())
+                      if name.endswith(".log") and name[:-4].isdigit())
+
+    # recording
+
+    def append(self, record):
+        if not self.recording:
+            return
+        try:
+            line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        except (TypeError, ValueError) as e:
+            logger.error(f"Journal : changement non enregistré {record[:3]} : {e}")
+            return
+        try:
+            if self.file is None:
+                os.makedirs(self.folder(), exist_ok=True)
+                # line buffered : each record reaches the system as soon as it is written
+                self.file = open(self.segment_path(self.segment), "a", encoding="utf-8", buffering=1)
+            self.file.write(line + "\n")
+        except OSError as e:
+            logger.error(f"Journal : écriture impossible dans {self.segment_path(self.segment)} : {e}")
+            return
+        self.records += 1
+
+    def compact_if_needed(self):
+        """Called after the moves and world changes, when the game state is consistent"""
+        if self.recording and self.max_records and self.records >= self.max_records:
+            logger.info(f"Journal : {self.records} changements depuis la dernière sauvegarde, sauvegarde complète")
+            self.universe.save_save()
+
+    def move(self, scene_name, entity_name, position):
+        self.append(["move", scene_name, entity_name, list(position)])
+        self.compact_if_needed()
+
+    def player(self, position):
+        self.append(["player", list(position)])
+        self.compact_if_needed()
+
+    def world(self, scene_name):
+        self.append(["world", scene_name])
+        self.compact_if_needed()
+
+    def inventory(self, inventory):
+        self.append(["inventory", inventory.export_data()])
+
+    def ext_data(self, owner, key, value):
+        """owner : "universe" or "player", whose ext_data[key] was set to value"""
+        self.append(["ext", owner, key, value])
+
+    def start(self):
+        self.recording = True
+
+    # saves
+
+    def rotate(self):
+        """
+        Called by save_save : the next records go to a new segment, returns its number (the segments before it
+        are in the save). None if nothing was recorded since the last save.
+        """
+        if not self.records:
+            return None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        self.segment += 1
+        self.records = 0
+        recording, self.recording = self.recording, True
+        for scene_name, moves in self.pending_moves.items():
+            for entity_name, position in moves.items():
+                self.append(["move", scene_name, entity_name, position])
+        self.recording = recording
+        return self.segment
+
+    def delete_before(self, segment):
+        """The save that holds the segments before this one is written (called on the SaveWriter thread)"""
+        for number in self.segments():
+            if number < segment:
+                try:
+                    os.remove(self.segment_path(number))
+                except OSError as e:
+                    logger.warning(f"Journal : impossible de supprimer {self.segment_path(number)} : {e}")
+
+    # loading
+
+    def replay(self, first_segment=0):
+        """Apply the segments from first_segment on to the universe that was just loaded, returns the records count"""
+        universe = self.universe
+        self.recording = False
+        self.pending_moves = {}
+        self.delete_before(first_segment)  # already in the save
+        segments = [number for number in self.segments() if number >= first_segment]
+        count = 0
+        for number in segments:
+            path = self.segment_path(number)
+            with open(path, "r", encoding="utf-8") as file:
+                lines = file.read().split("\n")
+            for i, line in enumerate(lines):
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                    self.apply(universe, record)
+                except Exception as e:
+                    if i == len(lines) - 1:
+                        logger.warning(f"Journal : dernier changement de {path} incomplet, ignoré")
+                    else:
+                        logger.error(f"Journal : changement illisible ligne {i + 1} de {path} : {e}")
+                    continue
+                count += 1
+        # the replayed segments stay until the next save holds them, the new records go after them
+        self.segment = max(segments[-1] + 1 if segments else 0, first_segment)
+        self.records = count
+        if count:
+            logger.info(f"Journal : {count} changements rejoués depuis {len(segments)} segment(s)")
+        return count
+
+    def apply(self, universe, record):
+        kind = record[0]
+        if kind == "move":
+            scene_name, entity_name, position = record[1:]
+            self.pending_moves.setdefault(scene_name, {})[entity_name] = position
+        elif kind == "player":
+            universe.player.set_position(record[1])
+        elif kind == "world":
+            universe.current_world = record[1]
+            universe.player.world = record[1]
+        elif kind == "inventory":
+            universe.player.inventory.load_data(record[1])
+        elif kind == "ext":
+            owner, key, value = record[1:]
+            (universe.player if owner == "player" else universe).ext_data[key] = value
+        else:
+            raise ValueError(f"type de changement inconnu : {kind}")
+
+    def apply_moves(self, scene):
+        """Moves of a scene that was not built when the journal was replayed, called when it is built"""
+        moves = self.pending_moves.pop(scene.scene_name, None)
+        if not moves:
+            return
+        recording, self.recording = self.recording, False
+        try:
+            for entity_name, position in moves.items():
+                entity = scene.entities.get(entity_name)
+                if entity is not None:
+                    entity.set_position(position)
+        finally:
+            self.recording = recording
@@ -0,0 +1,125 @@
+import atexit
+import os
+import queue
+import shutil
+import threading
+
+from engine.core.logging_setup import logger
+
+
+def write_atomic(content, filepath, backup=True):
+    """
+    Writes content (text or bytes) in filepath without ever leaving a partial or missing save : content goes to
+    <filepath>.tmp, is flushed to the disk (fsync), then replaces filepath with os.replace, which is atomic.
+    The previous version is kept as <filepath>.old. Creates the missing folders.
+    """
+    directory = os.path.dirname(filepath)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temporary = filepath + ".tmp"
+    with open(temporary, "wb") as file:
+        file.write(content.encode("utf-8") if isinstance(content, str) else content)
+        file.flush()
+        os.fsync(file.fileno())
+    if backup and os.path.exists(filepath):
+        backup_temporary = filepath + ".old.tmp"
+        if os.path.exists(backup_temporary):
+            os.remove(backup_temporary)
+        try:
+            os.link(filepath, backup_temporary)  # the current file stays where it is, nothing is copied
+        except OSError:
+            shutil.copyfile(filepath, backup_temporary)  # no hard links on this file system
+        os.replace(backup_temporary, filepath + ".old")
+    os.replace(temporary, filepath)
+    _sync_directory(directory)
+
+
+def _sync_directory(directory):
+    """The renames reach the disk too (POSIX only, Windows can not open a folder)"""
+    if os.name != "posix":
+        return
+    fd = os.open(directory or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class SaveWriter:
+    """
+    Writes the save files on a background thread, so the game never waits for the disk.
+    submit(path, content) queues a file : content is its text, or a function returning it, called on the
+    writer thread (it must only use data that does not change afterwards, e.g. strings).
+    A file submitted again before it was written is written once, with the last content, after the files
+    submitted in between.
+    flush() waits until everything is written, it is called when the program exits.
+    """
+    def __init__(self):
+        self.pending = {}  # path -> (content, on_error, on_written), oldest first
+        self.condition = threading.Condition()
+        self.busy = False  # a file is being written
+        self.thread = None
+        self.written = 0
+        self.coalesced = 0  # submissions replaced by a newer one before being written
+        self.errors = queue.SimpleQueue()  # on_error callbacks of the files that failed, see handle_errors
+
+    def submit(self, path, content, on_error=None, on_written=None):
+        """
+        If the file could not be written, on_error() is called by the next handle_errors(), on the game thread.
+        on_written() is called on the writer thread once the file is written, it must not touch the game state.
+        The files are written in the order they were last submitted : a file submitted again goes after the others,
+        so its on_written() comes after the files submitted before it are written.
+        """
+        with self.condition:
+            if self.pending.pop(path, None) is not None:
+                self.coalesced += 1
+            self.pending[path] = (content, on_error, on_written)
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name="save-writer", daemon=True)
+                self.thread.start()
+            self.condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.pending)
+                path = next(iter(self.pending))
+                content, on_error, on_written = self.pending.pop(path)
+                self.busy = True
+            written = False
+            try:
+                write_atomic(content() if callable(content) else content, path)
+                written = True
+                logger.info(f"Sauvegarde écrite dans {path}")
+            except Exception as e:
+                logger.error(f"Échec de l'écriture de la sauvegarde {path} : {e}")
+                if on_error is not None:
+                    self.errors.put(on_error)
+            else:
+                if on_written is not None:
+                    on_written()
+            finally:
+                with self.condition:
+                    self.busy = False
+                    self.written += written
+                    self.condition.notify_all()
+
+    def handle_errors(self):
+        """Calls the on_error callbacks of the files that failed since the last call, on the calling thread"""
+        while True:
+            try:
+                on_error = self.errors.get_nowait()
+            except queue.Empty:
+                return
+            on_error()
+
+    def flush(self, timeout=None):
+        """Waits until every submitted file is written, False if timeout (seconds) ran out before"""
+        with self.condition:
+            return self.condition.wait_for(lambda: not self.pending and not self.busy, timeout)
+
+
+save_writer = SaveWriter()
+atexit.register(save_writer.flush)
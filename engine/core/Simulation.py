@@ -0,0 +1,69 @@
+import time
+
+
+class Simulation:
+    """
+    Fixed timestep clock of the universe, independent from the inputs and from the rendering speed.
+    The UI calls advance() as often as it wants, the current world is updated by ticks of exactly 1/tick_rate
+    second (World.update(dt) -> Entity.update(dt)), so the result only depends on the number of ticks.
+    When a frame was too slow, the late ticks are run right away, but at most max_ticks_per_frame of them :
+    past that, the late time is dropped and the game slows down instead of freezing.
+    """
+    def __init__(self, universe, tick_rate=20, max_ticks_per_frame=5, max_updates_per_tick=64):
+        self.universe = universe
+        self.tick_rate = tick_rate
+        self.dt = 1 / tick_rate
+        self.max_ticks_per_frame = max_ticks_per_frame
+        self.max_updates_per_tick = max_updates_per_tick  # entities updated at most by a tick, see World.update
+        self.active_modes = {"exploration", "debug"}  # the world is paused in the other modes (dialogues, menus...)
+        self.tick_count = 0
+        self.accumulator = 0.0
+        self.last_time = None
+        self.idle = True  # the last advance() ran nothing, the clock starts again at the next one
+
+    def is_running(self):
+        return self.universe.mode in self.active_modes
+
+    def is_idle(self):
+        """True when a tick would change nothing : paused, or nothing to update nor timer in the current world"""
+        if not self.is_running():
+            return True
+        world = self.universe.scenes.get(self.universe.current_world)
+        return world is None or not world.needs_update()
+
+    def time_until_next_tick(self, now=None):
+        """Seconds before the next tick is due, None if the simulation is idle"""
+        if self.is_idle():
+            return None
+        if self.last_time is None:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        return max(0.0, self.dt - self.accumulator - (now - self.last_time))
+
+    def advance(self, now=None):
+        """Run the ticks due since the last call, returns how many were run"""
+        now = time.monotonic() if now is None else now
+        was_idle, self.idle = self.idle, self.is_idle()
+        if self.last_time is None or was_idle or self.idle:
+            # nothing to catch up after a pause or while nothing was moving : the UI may have waited for a key
+            # since the last call, that time is not game time
+            self.last_time = now
+            self.accumulator = 0.0
+            return 0
+        self.accumulator += now - self.last_time
+        self.last_time = now
+
+        ticks = 0
+        while self.accumulator >= self.dt and ticks < self.max_ticks_per_frame:
+            self.tick()
+            self.accumulator -= self.dt
+            ticks += 1
+        if self.accumulator >= self.dt:
+            self.accumulator %= self.dt  # too late, the remaining time is dropped
+        return ticks
+
+    def tick(self):
+        world = self.universe.scenes.get(self.universe.current_world)
+        if world is not None:
+            world.update(self.dt, self.max_updates_per_tick)
+        self.tick_count += 1
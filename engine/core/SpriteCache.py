@@ -0,0 +1,84 @@
+import os
+from collections import OrderedDict
+
+from engine.core.logging_setup import logger
+from engine.core.TextWidth import text_width
+
+
+def sprite_path(name):
+    """Path of the sprite file of an enemy id or a dialogue speaker"""
+    return "assets/sprites/{}.txt".format(name)
+
+
+def read_sprite(path):
+    """Lines of a sprite file and its size in terminal columns and lines (max_x, max_y), None if it does not exist"""
+    if not (os.path.exists(path) and os.path.isfile(path)):
+        return None
+    with open(path, "r", encoding="utf-8") as file:
+        lines = tuple(line.rstrip("\n") for line in file)
+    return lines, (max((text_width(line) for line in lines), default=0), len(lines))
+
+
+class SpriteCache:
+    """
+    Parsed sprites, path -> (lines, (max_x, max_y)), so drawing a sprite every frame does not touch the disk.
+    get() only reads a file the first time. preload() is called when a fight starts or a dialogue is loaded :
+    it reads the sprites that are not cached yet and reloads the ones whose file changed (mtime and size),
+    so an edited sprite shows up the next time it is needed.
+    A missing file is cached as an empty sprite (warned once). The least recently used sprites are dropped
+    past max_sprites.
+    """
+    def __init__(self, max_sprites=64):
+        self.max_sprites = max_sprites
+        self.sprites = OrderedDict()  # path -> (sprite, stamp)
+
+    @staticmethod
+    def _stamp(path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self, path, stamp):
+        sprite = read_sprite(path)
+        if sprite is None:
+            logger.warning(f"Sprite introuvable : {path}")
+            sprite = ((), (0, 0))
+        self.sprites[path] = (sprite, stamp)
+        self.sprites.move_to_end(path)
+        while len(self.sprites) > self.max_sprites:
+            self.sprites.popitem(last=False)
+        return sprite
+
+    def get(self, path):
+        entry = self.sprites.get(path)
+        if entry is not None:
+            self.sprites.move_to_end(path)
+            return entry[0]
+        return self._load(path, self._stamp(path))
+
+    def preload(self, paths):
+        for path in paths:
+            stamp = self._stamp(path)
+            entry = self.sprites.get(path)
+            if entry is None or entry[1] != stamp:
+                self._load(path, stamp)
+            else:
+                self.sprites.move_to_end(path)
+
+    def add(self, path, lines):
+        """Sprite that does not come from a file (generated), kept until it is evicted or preloaded again"""
+        lines = tuple(lines)
+        sprite = lines, (max((text_width(line) for line in lines), default=0), len(lines))
+        self.sprites[path] = (sprite, None)
+        self.sprites.move_to_end(path)
+        while len(self.sprites) > self.max_sprites:
+            self.sprites.popitem(last=False)
+        return sprite
+
+    def clear(self):
+        self.sprites.clear()
+
+
+sprite_cache = SpriteCache()
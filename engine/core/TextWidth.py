@@ -0,0 +1,72 @@
+from functools import lru_cache
+import unicodedata
+
+# A wide character (emoji, CJK...) takes 2 terminal columns. On a map every column is a tile, so the tile on
+# the right of a wide character holds PAD : it is drawn as nothing (the wide character already covers it)
+# and it is not walkable. The maps are padded when they are parsed, writing the PAD by hand is still accepted.
+PAD = "£"
+
+
+@lru_cache(maxsize=4096)
+def char_width(char):
+    """Number of terminal columns taken by a character"""
+    if char in ("", PAD):
+        return 0
+    if unicodedata.combining(char) or unicodedata.category(char) in ("Mn", "Me", "Cf"):
+        return 0
+    return 2 if unicodedata.east_asian_width(char) in ("W", "F") else 1
+
+
+@lru_cache(maxsize=4096)
+def text_width(text):
+    """Number of terminal columns taken by a string"""
+    if text.isascii():
+        return len(text)
+    return sum(char_width(char) for char in text)
+
+
+@lru_cache(maxsize=4096)
+def display_text(text):
+    """Text as it is written on the terminal : the PAD are removed"""
+    return text.replace(PAD, "") if PAD in text else text
+
+
+def pad_wide(row):
+    """Map row with a PAD after each wide character that does not already have one, one tile per column"""
+    if row.isascii():
+        return row
+    cells = []
+    previous_wide = False
+    for char in row:
+        if previous_wide and char != PAD:
+            cells.append(PAD)
+        cells.append(char)
+        previous_wide = char_width(char) == 2
+    if previous_wide:
+        cells.append(PAD)
+    return "".join(cells)
+
+
+@lru_cache(maxsize=1024)
+def display_cells(cells):
+    """
+    Text of a slice of map cells (e.g. the part of a row inside the viewport), as many columns as cells.
+    A PAD that does not follow a wide character (its wide character is outside the slice, or it was written
+    after a narrow one) and a wide character whose PAD is outside the slice become spaces,
+    so the rest of the row stays aligned on the tiles.
+    """
+    if cells.isascii():
+        return cells
+    text = []
+    previous_wide = False
+    for char in cells:
+        if char == PAD:
+            if not previous_wide:
+                text.append(" ")
+            previous_wide = False
+            continue
+        text.append(char)
+        previous_wide = char_width(char) == 2
+    if previous_wide:
+        text[-1] = " "
+    return "".join(text)
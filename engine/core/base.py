@@ -1,6 +1,13 @@
 from os.path import exists
 
 from engine.core.EventSystem import EventSystem
+from engine.core.MapGrid import MapGrid, MapLayout, ChunkedMapGrid, load_layout, LARGE_MAP_BYTES, DEFAULT_WALKABLE_TILES
+from engine.core.MapPack import load_packed_layout
+from engine.core.Pathfinding import PathFinder
+from engine.core.SaveCodec import get_codec, find_save, read_save
+from engine.core.SaveJournal import SaveJournal
+from engine.core.SaveWriter import save_writer
+from engine.core.Simulation import Simulation
 import engine.core.InputSystem as InputSystem
 from engine.core.DialogueSystem import setup_dialogue_system, dialogue_system
 from engine.core.CombatSystem import setup_combat_system, combat_system
@@ -9,38 +16,40 @@ from engine.core.logging_setup import logger
 from engine.core.ItemManager import Inventory, dealItem, item_list_renderer
 import os
 import random
-import json
-
-
-
-def save_json_with_backup(data, filepath):
-    """
-    Sauvegarde les données JSON dans `filepath`.
-    Si le fichier existe, le renomme en `<filepath>.old`.
-    Crée les dossiers manquants si nécessaire.
-    """
-    # Crée les dossiers si besoin
-    os.makedirs(os.path.dirname(filepath), exist_ok=True)
-
-    # Sauvegarde de l'ancien fichier si présent
-    if os.path.exists(filepath):
-        backup_name = filepath + ".old"
-        os.replace(filepath, backup_name)  # remplace l'ancien backup si déjà existant
-
-    # Écriture du nouveau fichier
-    try:
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
-    except Exception as e:
-        print(f"Erreur lors de la sauvegarde de {filepath} : {e}")
-        return False
-    return True
+import zlib
+from collections import OrderedDict
+
+
+
+def export_ext_data(ext_data):
+    """ext_data as it is saved : the extension instances are replaced by their extract_data()"""
+    data = {}
+    for ext_k, ext_v in ext_data.items():
+        if ext_k == "instances":
+            data[ext_k] = {inst_name: inst.extract_data() for inst_name, inst in ext_v.items()}
+        else:
+            data[ext_k] = ext_v
+    return data
+
 
 class UniverseData:
-    def __init__(self, world, screen_size, name="world", player="hero", player_position = (1,1), **kwargs):
+    def __init__(self, world, screen_size, name="world", player="hero", player_position = (1,1), max_live_scenes=16,
+                 save_format="json", journal=True, **kwargs):
         self.size = screen_size # (rows, cols)
         self.name = name
-        self.scenes = {}
+        self.save_codec = get_codec(save_format)  # format of the save files, see engine/core/SaveCodec.py
+        self.scenes = {}  # live scenes, from the least to the most recently visited
+        # past this number of live scenes, the least recently visited ones are hibernated (None for no limit)
+        self.max_live_scenes = max_live_scenes
+        self.hibernated_scenes = {}  # scene name -> compressed World.save_fragment()
+        # scenes of the loaded save that were not visited yet, each one is restored from its own file by set_world
+        self.stored_scenes = set()
+        # encoded sections of the last save, reused for what did not change (see save_save)
+        self.save_cache = {}
+        self.unsaved_scenes = set()  # hibernated scenes whose changes are not in their save file yet
+        # changes since the last save, replayed after it when the universe is loaded (see SaveJournal.py)
+        self.journal = SaveJournal(self)
+        self.journal_segment = 0  # first segment of the journal that is not in the save
         self.current_world = world
         self.player = Player(self, player, self.current_world if self.current_world else "",  player_position)
 
@@ -51,6 +60,8 @@ class UniverseData:
         self.on_mode_change = None
         self.request_text_input = None
 
+        self.simulation = Simulation(self)  # fixed timestep updates of the current world, driven by the UI loop
+
 
 
         self.ext_data = {}
@@ -69,17 +80,74 @@ class UniverseData:
         setup_shops(self.player)
         dealItem.setup_dealer(self.player)
         item_list_renderer.set_list(self.player.inventory.items)
+        if journal:  # False : the changes are only kept by the saves (e.g. benchmarks that must not touch saves/)
+            self.journal.start()
 
     # world gestion
     def set_world(self, world, **kwargs):
-        if world not in worlds:
-            logger.error(f"Monde {world} non trouvé dans les données d'extensions.")
-            world_class = World
-        else :
-            world_class = worlds[world]
-        self.add_scene(world, world_class, **kwargs)
+        if world in self.hibernated_scenes:
+            self.wake_scene(world)
+        elif world in self.stored_scenes:
+            self.restore_scene(world)
+        self.add_scene(world, self.get_scene_class(world), **kwargs)
+        self.journal.apply_moves(self.scenes[world])
         self.current_world = world
+        self.scenes[world] = self.scenes.pop(world)  # most recently visited scene goes last
         self.player.world = self.scenes[self.current_world]
+        self.hibernate_scenes()
+        self.journal.world(world)
+
+    def get_scene_class(self, world):
+        if world not in worlds:
+            logger.error(f"Monde {world} non trouvé dans les données d'extensions.")
+            return World
+        return worlds[world]
+
+    def hibernate_scenes(self):
+        """Serialize the least recently visited scenes while there are more live scenes than max_live_scenes"""
+        if not self.max_live_scenes:
+            return
+        for scene_name in list(self.scenes):
+            if len(self.scenes) <= self.max_live_scenes:
+                break
+            if scene_name == self.current_world or not self.scenes[scene_name].can_hibernate():
+                continue
+            try:
+                data = self.scenes[scene_name].save_fragment(self.save_codec)
+            except Exception as e:
+                logger.error(f"Impossible de mettre en veille la scène {scene_name}, elle reste chargée : {e}")
+                continue
+            self.hibernated_scenes[scene_name] = zlib.compress(data)
+            if self.scenes[scene_name].dirty or scene_name not in self.save_cache.get("scenes", {}):
+                self.unsaved_scenes.add(scene_name)  # its changes are only in the hibernated data now
+            del self.scenes[scene_name]
+
+    def wake_scene(self, scene_name):
+        """Rebuild a hibernated scene, as it was when it was hibernated"""
+        data = self.save_codec.decode(zlib.decompress(self.hibernated_scenes.pop(scene_name)))
+        self.add_scene(scene_name, self.get_scene_class(scene_name))
+        self.scenes[scene_name].load_data(data)
+
+    def scene_path(self, scene_name):
+        """Save file of a scene, without its extension (see SaveCodec.py)"""
+        return "saves/{}/scenes/{}".format(self.name, scene_name)
+
+    def restore_scene(self, scene_name):
+        """Rebuild a scene of the loaded save from its file, the first time it is visited"""
+        self.stored_scenes.discard(scene_name)
+        self.add_scene(scene_name, self.get_scene_class(scene_name))
+        path = self.scene_path(scene_name)
+        filename = find_save(path)
+        if filename is None:
+            logger.warning(f"Sauvegarde de la scène {scene_name} introuvable : {path}, la scène repart de zéro")
+            return
+        try:
+            data = read_save(filename)["scene"]
+        except Exception as e:
+            logger.error(f"Impossible de charger la scène {scene_name} depuis {filename}, elle repart de zéro : {e}")
+            return
+        self.scenes[scene_name].load_data(data)
+        logger.info(f"Scène {scene_name} chargée depuis {filename}")
 
     def get_scene(self):
         return self.current_world
@@ -91,6 +159,7 @@ class UniverseData:
                 self.scenes[world_name] = World(self, "World", "assets/maps/default_map.txt", **kwargs)
             else:
                 self.scenes[world_name] = scene_class(self, **kwargs)
+            self.scenes[world_name].scene_name = world_name
 
 
     # Mode gestion, mode is the way the sytem and the ui will work, for exemple dialogues and "exploration"
@@ -103,136 +172,310 @@ class UniverseData:
         """L’UI nous donne la fonction à appeler plus tard"""
         self.on_mode_change = callback
 
-    def save_save(self):
-        filename = "saves/{}/{}.json".format(self.name, self.name)
-        data = {}
+    def save_save(self, wait=False):
+        """
+        Saves the player file, the universe file and one file per scene (saves/<universe>/scenes/), each one only
+        if something it holds changed since the last save. Only the scenes that changed are encoded again (and in
+        them only the entities and events that changed, see World.save_fragment). The scenes of the loaded save
+        that were not visited keep their file as it is.
+        The files are written by the background SaveWriter : wait=True returns once they are on the disk.
+        """
+        save_writer.handle_errors()  # the files of the previous saves that could not be written are saved again
+        codec = self.save_codec
+        filename = "saves/{}/{}".format(self.name, self.name) + codec.extension
+        try:
+            self.player.save_save()
+        except Exception as e:
+            logger.error(f"Failed to save player {getattr(self.player, 'name', 'unknown')}: {e}")
+
+        cache = self.save_cache
+        if cache.get("codec") is not codec:
+            cache = self.save_cache = {"codec": codec}
+        changed = False
+        segment = self.journal.rotate()  # the changes recorded until now are in this save
+        if segment is not None:
+            self.journal_segment = segment
+        header = []
         for key, value in self.__dict__.items():
-            if key in ("scenes", "current_world", "player", "ext_data", "input_system", "dialogue_system",
-                     "combat_system", "on_mode_change", "mode","request_text_input"):
-                if key == "scenes":
-                    scenes_data = {}
-                    for scene_name, scene in value.items():
-                        try:
-                            scenes_data[scene_name] = scene.extract_data()
-                        except Exception as e:
-                            logger.error(f"Failed to extract data for scene {scene_name}: {e}")
-                    data[key] = scenes_data
-                elif key == "current_world":
-                    try:
-                        data[key] = value
-                    except Exception as e:
-                        logger.error(f"Failed to save current_world: {e}")
-                elif key == "player":
-                    try:
-                        self.player.save_save()
-                    except Exception as e:
-                        logger.error(f"Failed to save player {getattr(self.player, 'name', 'unknown')}: {e}")
-                elif key == "ext_data":
-                    data[key] = {}
-                    for ext_k, ext_v in value.items():
-                        if ext_k == "instances":
-                            data[key][ext_k] = {}
-                            for inst_name, inst in ext_v.items():
-                                data[key][ext_k][inst_name] = inst.extract_data()
-                        else:
-                            data[key][ext_k] = ext_v
-                # the rest of the excluded attributes are not saved
-            else:
-                try:
-                    data[key] = value
-                except Exception as e:
-                    logger.error(f"Failed to save attribute {key}: {e}")
+            if key in ("scenes", "player", "ext_data", "input_system", "dialogue_system", "combat_system",
+                       "on_mode_change", "mode", "request_text_input", "max_live_scenes", "hibernated_scenes",
+                       "simulation", "save_cache", "save_codec", "stored_scenes", "unsaved_scenes", "journal"):
+                continue  # scenes and ext_data are added below, the rest is not saved
+            try:
+                header.append((key, codec.encode(value)))
+            except Exception as e:
+                logger.error(f"Failed to save attribute {key}: {e}")
+        if header != cache.get("header"):
+            cache["header"] = header
+            changed = True
         try:
-            if save_json_with_backup(data, filename):
-                logger.info(f"Progression de l'univers sauvegardée dans {filename}")
-            else:
-                logger.error(f"Échec de la sauvegarde de la progression de l'univers dans {filename}")
+            ext_data = codec.encode(export_ext_data(self.ext_data))
         except Exception as e:
-            logger.error(f"Unexpected error while saving universe to {filename}: {e}")
+            logger.error(f"Failed to save ext_data: {e}")
+            ext_data = cache.get("ext_data", codec.encode({}))
+        if ext_data != cache.get("ext_data"):
+            cache["ext_data"] = ext_data
+            changed = True
+
+        scenes = cache.setdefault("scenes", {})  # live scene name -> encoded scene of the last save
+        for scene_name in [scene_name for scene_name in scenes if scene_name not in self.scenes]:
+            del scenes[scene_name]  # hibernated since the last save
+        for scene_name, scene in self.scenes.items():
+            if scene.dirty or scene_name not in scenes:
+                try:
+                    fragment = scene.save_fragment(codec)
+                except Exception as e:
+                    logger.error(f"Failed to extract data for scene {scene_name}: {e}")
+                    continue
+                scene.dirty = False
+                if fragment != scenes.get(scene_name):
+                    scenes[scene_name] = fragment
+                    self.save_scene(scene_name, fragment, self.forget_save_cache)
+        for scene_name in self.unsaved_scenes:
+            if scene_name in self.hibernated_scenes:
+                self.save_scene(scene_name, self.hibernated_scenes[scene_name],
+                                lambda scene_name=scene_name: self.unsaved_scenes.add(scene_name))
+        self.unsaved_scenes = set()
+
+        # the universe file only lists the scenes, it changes when a scene is visited for the first time
+        scene_names = codec.encode(sorted(set(self.scenes) | set(self.hibernated_scenes) | self.stored_scenes))
+        if scene_names != cache.get("scene_names"):
+            cache["scene_names"] = scene_names
+            changed = True
+        if changed:
+            parts = header + [("scenes", scene_names), ("ext_data", ext_data)]
+            # written after the player and scene files, the journal up to this save is not needed anymore then
+            save_writer.submit(filename, lambda: codec.document(parts), on_error=self.forget_save_cache,
+                               on_written=lambda segment=self.journal_segment: self.journal.delete_before(segment))
+            logger.info(f"Progression de l'univers envoyée à la sauvegarde ({filename})")
+        else:
+            logger.info(f"Univers inchangé depuis la dernière sauvegarde, {filename} n'est pas réécrit")
+        if wait:
+            save_writer.flush()
+
+    def save_scene(self, scene_name, fragment, on_error):
+        """Sends the file of a scene to the SaveWriter, fragment is its encoded data (compressed if hibernated)"""
+        codec = self.save_codec
+        compressed = scene_name in self.hibernated_scenes
+
+        def build():
+            return codec.document([("scene", zlib.decompress(fragment) if compressed else fragment)])
+
+        save_writer.submit(self.scene_path(scene_name) + codec.extension, build, on_error=on_error)
+
+    def forget_save_cache(self):
+        """The last save was not written : everything is serialized again next time"""
+        self.save_cache = {}
 
     def load_save(self):
-        filename = "saves/{}/{}.json".format(self.name, self.name)
-        if os.path.exists(filename) and os.path.isfile(filename):
-            with open(filename, 'r', encoding='utf-8') as file:
-                data = json.load(file)
-                self.scenes = {}
-                for key, value in data.items():
-                    if key == 'scenes':
-                        i=0
-                        for scene_name, scene_data in value.items():
-                            i+=1
-                            # Chercher directement dans worlds par le nom de classe
-                            if scene_name in worlds:
-                                scene_class = worlds[scene_name]
-                                self.add_scene(scene_name, scene_class)
-                                self.scenes[scene_name].load_data(scene_data)
-                            else:
-                                logger.warning(f"Classe de scène {scene_name} non trouvée dans worlds.")
-                    elif key == 'ext_data':
-                        for ext_k, ext_v in value.items():
-                            if ext_k == "instances":
-                                for inst_name, inst_data in ext_v.items():
-                                    self.ext_data["instances"][inst_name].load_data(inst_data)
-                            else:
-                                self.ext_data[ext_k] = ext_v
-                    else:
-                        setattr(self, key, value)
+        path = "saves/{}/{}".format(self.name, self.name)
+        filename = find_save(path)  # in any format, see SaveCodec.py
+        if filename is not None:
+            data = read_save(filename)
+            self.scenes = {}
+            self.hibernated_scenes = {}
+            self.stored_scenes = set()
+            self.unsaved_scenes = set()
+            for key, value in data.items():
+                if key == 'scenes':
+                    # the scenes are only built when the player enters them (set_world)
+                    for scene_name in value:
+                        # Chercher directement dans worlds par le nom de classe
+                        if scene_name not in worlds:
+                            logger.warning(f"Classe de scène {scene_name} non trouvée dans worlds.")
+                        elif isinstance(value, dict):
+                            # save of schema 1, all the scenes are in this file : they wait hibernated, and get
+                            # their own file at the next save
+                            self.hibernated_scenes[scene_name] = zlib.compress(self.save_codec.encode(value[scene_name]))
+                            self.unsaved_scenes.add(scene_name)
+                        else:
+                            self.stored_scenes.add(scene_name)
+                elif key == 'ext_data':
+                    for ext_k, ext_v in value.items():
+                        if ext_k == "instances":
+                            for inst_name, inst_data in ext_v.items():
+                                self.ext_data["instances"][inst_name].load_data(inst_data)
+                        else:
+                            self.ext_data[ext_k] = ext_v
+                else:
+                    setattr(self, key, value)
             self.player.load_player()
+            self.journal.replay(self.journal_segment)
             self.set_world(self.player.world)
             self.player.world = self.scenes[self.current_world]
             logger.info(f"Progression de l'univers chargée depuis {filename}")
         else:
-            logger.warning(f"Fichier de sauvegarde introuvable : {filename}")
+            logger.warning(f"Fichier de sauvegarde introuvable : {path}")
+            self.journal.replay()  # the game stopped before its first save
 
 
 class World:
     def __init__(self, data, name, map, **kwargs):
         self.data = data
-        self.walkable_tiles = ['.', ',', ';', ':', '*', ' ']
+        self.grid = None
+        # changes each time the map, the walkable tiles or a static occupant changes (used by the pathfinder caches)
+        self.terrain_version = 0
+        self.walkable_tiles = DEFAULT_WALKABLE_TILES
         self.entities = {}
         self.name = name
+        self.scene_name = name  # key of the world in universe.scenes, set by UniverseData.add_scene
         self.map = map  # empty map for initialisation
+        # saving : what the last save_fragment() encoded and what changed since then
+        self.save_codec = None  # codec of the fragments below
+        self.entity_fragments = {}  # entity name -> encoded name and data of the entity
+        self.events_fragment = None  # None when an event changed
+        self.dirty_entities = set()  # names of the entities added, changed or removed
+        self.dirty = True  # changed since the last save of the universe
+        # occupancy index : tile -> {id(occupant): occupant}, entities and positioned events that live on the tile
+        self.occupancy = {}
         self.event_system = EventSystem(self)
+        # simulation : entities that asked to be updated (name -> (entity, tick of its last update)) and timers
+        self.updating = OrderedDict()
+        self.timers = []
+        self.ticks = 0
 
-        self.map_data = self.load_map()
+        self.grid = self.load_map()
+        self.pathfinder = PathFinder(self)
 
+    @property
+    def walkable_tiles(self):
+        """
+        Characters of the map that can be walked on, as a tuple. Assign any iterable of characters to change them
+        (world.walkable_tiles = [...]), the walkability bitmap of the grid is rebuilt; the tuple can not be changed
+        in place, add a character with world.walkable_tiles = (*world.walkable_tiles, "~")
+        """
+        return self._walkable_tiles
+
+    @walkable_tiles.setter
+    def walkable_tiles(self, tiles):
+        self._walkable_tiles = tuple(tiles)
+        self.terrain_version += 1
+        if self.grid is not None:
+            self.grid.set_walkable_tiles(self._walkable_tiles)
+
+    @property
+    def map_data(self):
+        """Rows of the map as strings, built from the grid (use self.grid in hot paths)"""
+        return self.grid.rows()
 
     def load_map(self):
+        layout = load_packed_layout(self.map)
+        if layout is not None:
+            # compiled by engine/compile_maps.py, nothing to read nor parse
+            return MapGrid(layout, self.walkable_tiles)
         if os.path.exists(self.map) and os.path.isfile(self.map):
-            with open(self.map, 'r', encoding='utf-8') as file:
-                map_data = [line.rstrip('\n') for line in file]
-            return map_data
+            if os.path.getsize(self.map) > LARGE_MAP_BYTES:
+                # big map, read by chunks around the player instead of all at once
+                return ChunkedMapGrid(self.map, self.walkable_tiles)
+            layout = load_layout(self.map)
         elif os.path.exists("assets/maps/default_map.txt") and os.path.isfile("assets/maps/default_map.txt"):
-            with open("assets/maps/default_map.txt", 'r', encoding='utf-8') as file:
-                map_data = [line.rstrip('\n') for line in file]
+            layout = load_layout("assets/maps/default_map.txt")
             logger.warning(f"Fichier de map introuvable : {self.map}, chargement de la map par défaut.")
-            return map_data
         else:
             logger.error(f"Fichier de map introuvable : {self.map}, et map par défaut également absente.")
-            return ["#####","#   #","#   #","#   #","#####"]  # return a default empty map
+            layout = MapLayout(["#####","#   #","#   #","#   #","#####"])  # default empty map
+        # the layout comes from the shared cache, only the walkability bitmap belongs to this world
+        return MapGrid(layout, self.walkable_tiles)
 
-    def is_walkable(self, tile):
+    def is_walkable(self, tile, include_movable=True):
+        """
+        :param include_movable: if False, the entities that can move do not block the tile (terrain only)
+        """
         y, x = tile
-        if y < 0 or y >= len(self.map_data) or x < 0 or x >= len(self.map_data[0]):
-            return False  # en dehors des limites de la carte
-        walkable = False
-        if self.map_data[y][x] in self.walkable_tiles:
-            if self.event_system.get_event(tile):
-                walkable =  self.event_system.get_event(tile).walkable
-            else:
-                walkable =  True
-            # vérifier les entités
-            for entity in self.entities.values():
-                if tuple(entity.get_position()) == tile and not entity.is_walkable():
-                    walkable = False
-        return walkable
+        if not self.grid.is_walkable(y, x):
+            return False
+        # only the occupants of this tile are checked, no scan over every entity/event
+        for occupant in self.occupancy.get((y, x), {}).values():
+            if not occupant.is_walkable() and (include_movable or not getattr(occupant, "movable", False)):
+                return False
+        return True
+
+    # occupancy index, kept up to date by entities and the event system
+    def occupy(self, tile, occupant):
+        if tile is None:
+            return
+        self.occupancy.setdefault(tuple(tile), {})[id(occupant)] = occupant
+        if not getattr(occupant, "movable", False):
+            self.terrain_version += 1
 
+    def vacate(self, tile, occupant):
+        if tile is None:
+            return
+        tile = tuple(tile)
+        occupants = self.occupancy.get(tile)
+        if occupants and id(occupant) in occupants:
+            del occupants[id(occupant)]
+            if not occupants:
+                del self.occupancy[tile]
+            if not getattr(occupant, "movable", False):
+                self.terrain_version += 1
+
+    def move_occupant(self, occupant, old_tile, new_tile):
+        self.vacate(old_tile, occupant)
+        self.occupy(new_tile, occupant)
+
+    def get_occupants(self, tile):
+        """Return the entities and positioned events on a tile"""
+        return list(self.occupancy.get(tuple(tile), {}).values())
+
+    # simulation, called by UniverseData.simulation at a fixed rate while the world is the current one
+    def update(self, dt, max_updates=None):
+        """
+        One tick of the world : the timers, then the entities that asked for updates.
+        If there are more than max_updates of them, they are updated in turn and each one receives
+        the time elapsed since its own last update.
+        """
+        self.ticks += 1
+        for timer in list(self.timers):
+            timer[0] -= dt
+            if timer[0] <= 0:
+                if timer[1]:
+                    timer[0] += timer[1]
+                else:
+                    self.timers.remove(timer)
+                timer[2]()
+
+        count = len(self.updating) if not max_updates else min(max_updates, len(self.updating))
+        for _ in range(count):
+            name, (entity, last_tick) = self.updating.popitem(last=False)
+            if entity.update((self.ticks - last_tick) * dt):
+                self.updating[name] = (entity, self.ticks)
+
+    def request_updates(self, entity):
+        """The entity will have its update(dt) method called every tick until it returns False"""
+        if entity.name not in self.updating:
+            self.updating[entity.name] = (entity, self.ticks)
+
+    def add_timer(self, delay, callback, repeat=False):
+        """Call callback() after delay seconds of simulation (and every delay seconds if repeat)"""
+        timer = [delay, delay if repeat else 0, callback]
+        self.timers.append(timer)
+        return timer
+
+    def remove_timer(self, timer):
+        if timer in self.timers:
+            self.timers.remove(timer)
+
+    def needs_update(self):
+        return bool(self.updating or self.timers)
+
+    def can_hibernate(self):
+        """
+        False while a timer runs or an entity is updated for another reason than walking : the callbacks and the
+        update requests can not be saved, only the walks are restored by load_data
+        """
+        return not self.timers and all(entity.walk_target is not None for entity, _ in self.updating.values())
 
     def add_entity(self, entity):
         """Add an entity to the world, entity is an instance of Entity class
         it as world, name, position, sprite and other optional parameters
         """
+        if entity.name in self.entities:
+            previous = self.entities[entity.name]
+            self.vacate(previous.get_position(), previous)
         self.entities[entity.name] = entity
+        self.occupy(entity.get_position(), entity)
+        self.mark_entity_dirty(entity.name)
         return entity
 
     def remove_entity(self, entity_name):
@@ -240,13 +483,29 @@ class World:
         if entity_name in self.entities:
             if self.entities[entity_name].events:
                 self.entities[entity_name].remove_all_events()
+            self.vacate(self.entities[entity_name].get_position(), self.entities[entity_name])
+            self.updating.pop(entity_name, None)
             del self.entities[entity_name]
+            self.mark_entity_dirty(entity_name)
     def remove_all_entities(self):
         """Remove all entities from the world"""
         for entity_name in list(self.entities.keys()):
             self.remove_entity(entity_name)
 
 
+    def mark_entity_dirty(self, entity_name):
+        self.dirty_entities.add(entity_name)
+        self.dirty = True
+
+    def mark_events_dirty(self):
+        self.events_fragment = None
+        self.dirty = True
+
+    def journal_move(self, entity):
+        journal = getattr(self.data, "journal", None)
+        if journal is not None:
+            journal.move(self.scene_name, entity.name, entity.position)
+
     def extract_data(self):
         """Extract data from the world for saving purposes"""
         data = {
@@ -256,14 +515,41 @@ class World:
         }
         for name, entity in self.entities.items():
             data["entities"][name] = entity.extract_data()
-        for event in self.event_system.events:
+        for event in self.event_system.events.values():
             data["events"][event.name] = event.extract_data()
 
 
         return data
 
+    def save_fragment(self, codec):
+        """
+        extract_data() encoded by codec (see SaveCodec.py), used by the saves. The encoded entities are kept :
+        only the ones that changed since the last call are extracted and encoded again (and the events if one
+        of them changed).
+        """
+        if codec is not self.save_codec:
+            self.save_codec = codec
+            self.entity_fragments = {}
+            self.dirty_entities = set(self.entities)
+            self.events_fragment = None
+        for name in self.dirty_entities:
+            if name in self.entities:
+                self.entity_fragments[name] = codec.entry(name, codec.encode(self.entities[name].extract_data()))
+            else:
+                self.entity_fragments.pop(name, None)  # removed
+        self.dirty_entities = set()
+        if self.events_fragment is None:
+            self.events_fragment = codec.encode({event.name: event.extract_data()
+                                                 for event in self.event_system.events.values()})
+        return codec.object([("map", codec.encode(self.map)),
+                             ("entities", codec.join(list(self.entity_fragments.values()))),
+                             ("events", self.events_fragment)])
+
     def load_data(self, data):
         """Load data into the world from a saved state"""
+        self.entity_fragments = {}
+        self.dirty_entities = set()
+        self.mark_events_dirty()
         self.map = data.get("map", self.map)
         self.name = data.get("name", self.name)
 
@@ -272,19 +558,27 @@ class World:
             entity.remove_all_events()
 
         self.entities = {}
-        self.event_system.events = []
+        self.event_system.clear()
+        self.occupancy = {}
+        self.terrain_version += 1
 
         # Load entities FIRST
         entities_data = data.get("entities", {})
         for name, entity_data in entities_data.items():
-            entity = Entity(
-                self,
-                entity_data["name"],
-                entity_data["position"],
-                entity_data["sprite"],
-                walkable=entity_data.get("walkable", False)
-            )
-            self.add_entity(entity)
+            self.add_entity(Entity.from_data(self, entity_data))
+        # then what the walking entities follow, it can be another entity of the world or the player
+        for entity in self.entities.values():
+            target = entity.walk_target
+            if isinstance(target, dict):
+                player = getattr(self.data, "player", None)
+                if player is not None and player.name == target.get("entity"):
+                    entity.walk_target = player
+                else:
+                    entity.walk_target = self.entities.get(target.get("entity"))
+            elif target is not None:
+                entity.walk_target = tuple(target)
+            if entity.walk_target is not None:
+                self.request_updates(entity)
 
         # Load events SECOND
         for name, event_data in data.get("events", {}).items():
@@ -310,7 +604,20 @@ class World:
                 self.event_system.add_event(event)
 
 
+# entity classes by name, so the saves and the hibernated scenes rebuild each entity with its own class
+entity_classes = {}
+_missing = object()
+_immutable_types = (str, int, float, bool, tuple, frozenset, type(None))
+
+
 class Entity:
+    # not saved by extract_data, changing them does not make the entity dirty
+    unsaved_attributes = frozenset(("world", "events", "walk_progress"))
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        entity_classes[cls.__name__] = cls
+
     def __init__(self, world, name, position, sprite, events = None, walkable = False, **kwargs):
         self.name = name
         self.position = position
@@ -319,19 +626,90 @@ class Entity:
         self.movable = False
         self.walkable = walkable
         self.events = {}
+        # walk_to state, used by update()
+        self.walk_target = None
+        self.walk_speed = 4  # tiles per second
+        self.walk_progress = 0.0
 
         if events:
             for event in events:
                 self.add_event(event)
                 event.entity = self
+
+    def __setattr__(self, key, value):
+        old = self.__dict__.get(key, _missing)
+        object.__setattr__(self, key, value)
+        if key in self.unsaved_attributes:
+            return
+        # the same immutable value changes nothing (e.g. the orientation when the player turns the same way), a list
+        # or a dict can have been changed in place before being assigned again
+        if isinstance(value, _immutable_types) and type(old) is type(value) and old == value:
+            return
+        self.mark_dirty()
+
+    def mark_dirty(self):
+        """The next save extracts the entity again, to call after changing a saved attribute in place (e.g. a list)"""
+        world = self.__dict__.get("world")
+        if world is not None and getattr(world, "entities", None) is not None and world.entities.get(self.name) is self:
+            world.mark_entity_dirty(self.name)
+
     def get_position(self):
         return tuple(self.position)
     def set_position(self, position):
-        self.position = position
+        old_position = self.get_position()
+        self.position = tuple(position)
+        placed = self.is_placed()
+        if placed:
+            self.world.move_occupant(self, old_position, self.position)
+        for event in self.events.values():
+            self.world.event_system.relocate(event, old_position, self.position)
+        if placed:
+            self.world.journal_move(self)
     def move(self, dx, dy):
         x, y = self.position
         if self.world.is_walkable((x+dx, y+dy)) and self.movable:
-            self.position = (x + dx, y + dy)
+            self.set_position((x + dx, y + dy))
+    def walk_to(self, target, speed=None):
+        """
+        Walk toward target with the simulation ticks, target is a position or an entity to follow (e.g. the player).
+        The entity stops next to a position, it keeps following an entity.
+        """
+        self.walk_target = target
+        if speed is not None:
+            self.walk_speed = speed
+        self.walk_progress = 0.0
+        self.world.request_updates(self)
+
+    def update(self, dt):
+        """Called by the simulation while the entity asked for it (World.request_updates), return False to stop"""
+        if self.walk_target is None:
+            return False
+        following = isinstance(self.walk_target, Entity)
+        self.walk_progress += dt * self.walk_speed
+        while self.walk_progress >= 1:
+            self.walk_progress -= 1
+            target = self.walk_target.get_position() if following else self.walk_target
+            if not self.step_towards(target) and not following:
+                y, x = self.get_position()
+                if abs(y - target[0]) + abs(x - target[1]) <= 1:
+                    self.walk_target = None
+                    return False
+        return True
+
+    def step_towards(self, target):
+        """Move one tile toward target (e.g. the player position) using the world pathfinder, True if it moved"""
+        if not self.movable or not self.is_placed():
+            return False
+        step = self.world.pathfinder.next_step(self.get_position(), target)
+        if step is None:
+            return False
+        self.set_position(step)
+        return True
+
+    def is_placed(self):
+        """True if the entity is registered in its world, so it is part of the occupancy index"""
+        entities = getattr(self.world, "entities", None)
+        return entities is not None and entities.get(self.name) is self
 
     def add_event(self, event):
         if not isinstance(event, Event):
@@ -354,21 +732,40 @@ class Entity:
         data = {
         }
         for k, v in self.__dict__.items():
-            if k not in ("world", "events"):
+            if k not in self.unsaved_attributes:
                 data[k] = v
+        if isinstance(data.get("walk_target"), Entity):
+            data["walk_target"] = {"entity": data["walk_target"].name}  # followed entity, saved by name
+        data["class"] = type(self).__name__
 
         return data
 
+    @classmethod
+    def from_data(cls, world, data):
+        """
+        Entity of world rebuilt from extract_data(), with its own class and every saved attribute.
+        The constructor of the class is not called (its events, e.g. the dialogue of an NPC, are saved with the
+        world and added back by World.load_data). walk_target is set as it was saved, see World.load_data.
+        """
+        entity_class = entity_classes.get(data.get("class"), Entity)
+        entity = entity_class.__new__(entity_class)
+        Entity.__init__(entity, world, data["name"], tuple(data["position"]), data["sprite"])
+        entity.load_data({key: value for key, value in data.items() if key != "class"})
+        return entity
+
     def load_data(self, data):
         for key, value in data.items():
             if key == "position":
-                self.position = tuple(value)
+                self.set_position(value)
             else:
                 setattr(self, key, value)
 
 
 
 class Event:
+    # saved by extract_data, changing them makes the events of the world dirty
+    saved_attributes = frozenset(("name", "position", "active", "activation_type", "action_type", "kwargs", "entity"))
+
     def __init__(self, data, world, name, activation_type, action_type, entity=None, position = None, activate = True, **kwargs):
         """
         Initialise un événement dans le jeu.
@@ -410,6 +807,17 @@ class Event:
             self.necessary_args = ["mode"] # new mode to switch to
         self.check_event_args(self.necessary_args, kwargs)
 
+    def __setattr__(self, key, value):
+        event_system = getattr(self.__dict__.get("world"), "event_system", None)
+        if key == "position" and event_system is not None and "position" in self.__dict__:
+            event_system.move_event(self, value)  # the event is found and collides at its new tile
+        else:
+            object.__setattr__(self, key, value)
+        if key in self.saved_attributes:
+            mark_events_dirty = getattr(self.__dict__.get("world"), "mark_events_dirty", None)
+            if mark_events_dirty is not None:
+                mark_events_dirty()
+
     def check_event_args(self, required_args, kwargs):
         missing = [arg for arg in required_args if arg not in kwargs]
         if missing:
@@ -419,9 +827,12 @@ class Event:
     @property
     def get_position(self):
         if self.entity is None:
-            return None
+            return tuple(self.position) if self.position is not None else None
         return self.entity.get_position()
 
+    def is_walkable(self):
+        return self.walkable
+
     def is_facing_player(self):
         x, y = self.data.player.get_position()
         dx, dy = {"UP": (-1, 0), "DOWN": (1, 0), "LEFT": (0, -1), "RIGHT": (0, 1)}.get(
@@ -492,7 +903,12 @@ class NPC(Entity):
 
 
 class Player(Entity):
+    # the player has its own file, its world is saved (by name)
+    unsaved_attributes = frozenset(("events", "universe", "walk_target", "walk_progress", "dirty", "save_cache"))
+
     def __init__(self,universe, name, world, position):
+        self.dirty = True  # changed since the last save, see save_save
+        self.save_cache = {}  # JSON texts of the sections of the last save
         super().__init__(world, name, position, '@')
         self.movable = True
         self.universe = universe
@@ -500,6 +916,7 @@ class Player(Entity):
         self.orientation = "DOWN"  # Possible orientations: UP, DOWN, LEFT, RIGHT
 
         self.inventory = Inventory()
+        self.inventory.on_change = lambda: universe.journal.inventory(self.inventory)
         self.ext_data = {
             "abilities": {}
         }
@@ -512,6 +929,16 @@ class Player(Entity):
         self.defense = 5
 
 
+    def mark_dirty(self):
+        self.__dict__["dirty"] = True
+
+    def set_position(self, position):
+        super().set_position(position)
+        grid = getattr(self.world, "grid", None)
+        if grid is not None:
+            grid.focus(*self.position)  # big maps only keep the chunks around the player
+        self.universe.journal.player(self.position)
+
     def attack(self):
             return self.damage
 
@@ -536,55 +963,69 @@ class Player(Entity):
 
 
     def save_save(self):
-        filename = "saves/{}/{}/{}.json".format(self.universe.name,self.name, self.name)
-        # Crée un dictionnaire filtré pour la sauvegarde
-        data = {}
-        for key, value in self.__dict__.items():
-            # Exclude attributes that should not be serialized; add extra conditions as needed
-            if key in ("world", "events", "universe", "inventory", "ext_data"):
-                if key == "inventory":
-                    data[key] = value.export_data()
-                elif key == "ext_data":
-                    data[key] = {}
-                    for ext_k, ext_v in value.items():
-                        if ext_k == "instances":
-                            data[key][ext_k] = {}
-                            for inst_name, inst in ext_v.items():
-                                data[key][ext_k][inst_name] = inst.extract_data()
-                        else:
-                            data[key][ext_k] = ext_v
+        """
+        Saves the player file if the player, its inventory or its ext_data changed since the last save (written by
+        the SaveWriter), the sections that did not change reuse what was encoded for the last save.
+        """
+        codec = self.universe.save_codec
+        filename = "saves/{}/{}/{}".format(self.universe.name,self.name, self.name) + codec.extension
+        cache = self.save_cache
+        if cache.get("codec") is not codec:
+            cache = self.save_cache = {"codec": codec}
+        changed = False
+        if self.dirty or "attributes" not in cache:
+            # Crée un dictionnaire filtré pour la sauvegarde
+            data = {}
+            for key, value in self.__dict__.items():
+                # Exclude attributes that should not be serialized; add extra conditions as needed
+                if key not in ("world", "events", "universe", "inventory", "ext_data", "walk_target", "walk_progress",
+                               "dirty", "save_cache"):
+                    data[key] = value
+            data['world'] = self.world.scene_name
+            cache["attributes"] = [(key, codec.encode(value)) for key, value in data.items()]
+            changed = True
+        if self.inventory.dirty or "inventory" not in cache:
+            cache["inventory"] = codec.encode(self.inventory.export_data())
+            changed = True
+        ext_data = codec.encode(export_ext_data(self.ext_data))
+        if ext_data != cache.get("ext_data"):
+            cache["ext_data"] = ext_data
+            changed = True
+        self.dirty = False
+        self.inventory.dirty = False
+        if not changed:
+            return
 
-            else:
-                data[key] = value
-        data['world'] = self.world.name
+        parts = cache["attributes"] + [("inventory", cache["inventory"]), ("ext_data", ext_data)]
+        save_writer.submit(filename, lambda: codec.document(parts), on_error=self.forget_save_cache)
+        logger.info(f"Progression du joueur envoyée à la sauvegarde ({filename})")
 
-        if save_json_with_backup(data, filename):
-            logger.info(f"Progression du joueur sauvegardée dans {filename}")
-        else:
-            logger.error(f"Échec de la sauvegarde de la progression du joueur dans {filename}")
+    def forget_save_cache(self):
+        """The last save was not written : everything is serialized again next time"""
+        self.save_cache = {}
 
     def load_player(self):
-        filename = "saves/{}/{}/{}.json".format(self.universe.name,self.name, self.name)
-        if os.path.exists(filename) and os.path.isfile(filename):
-            with open(filename, 'r', encoding='utf-8') as file:
-                data = json.load(file)
-                for key, value in data.items():
-                    if key == "inventory":
-                        self.inventory.load_data(value)
-                    elif key == 'ext_data':
-                        for ext_k, ext_v in value.items():
-                            if ext_k == "instances":
-                                for inst_name, inst_data in ext_v.items():
-                                    self.ext_data["instances"][inst_name].load_data(inst_data)
-                            else:
-                                self.ext_data[ext_k] = ext_v
-                    else:
-                        # load des attributs :
-                        setattr(self, key, value)
+        path = "saves/{}/{}/{}".format(self.universe.name,self.name, self.name)
+        filename = find_save(path)  # in any format, see SaveCodec.py
+        if filename is not None:
+            data = read_save(filename)
+            for key, value in data.items():
+                if key == "inventory":
+                    self.inventory.load_data(value)
+                elif key == 'ext_data':
+                    for ext_k, ext_v in value.items():
+                        if ext_k == "instances":
+                            for inst_name, inst_data in ext_v.items():
+                                self.ext_data["instances"][inst_name].load_data(inst_data)
+                        else:
+                            self.ext_data[ext_k] = ext_v
+                else:
+                    # load des attributs :
+                    setattr(self, key, value)
 
             logger.info(f"Progression du joueur chargée depuis {filename}")
         else:
-            logger.warning(f"Fichier de sauvegarde introuvable : {filename} (normal if new player)")
+            logger.warning(f"Fichier de sauvegarde introuvable : {path} (normal if new player)")
 
 
 """Charge les items depuis un fichier JSON. Retourne un dict vide si le fichier est absent ou invalide."""
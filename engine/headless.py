@@ -0,0 +1,142 @@
+"""
+Headless runner : drives a UniverseData without any UI (no curses, no terminal) by feeding scripted actions
+to the input modes of engine/core/InputSystem.py, and measures how fast the engine handles them.
+
+From the project root :
+    python -m engine.headless --random 10000 --seed 1
+    python -m engine.headless --script my_actions.txt
+A script file has one action per line, the same strings as the key mapping of the UI (UP, INTERACT, INVENTORY...),
+digits for the numbered choices and # for comments.
+The save of the universe is loaded if it exists, but nothing is written to saves/ while running : the save journal
+(engine/core/SaveJournal.py) is off unless --journal is given, so every run starts from the same state.
+"""
+import argparse
+import math
+import random
+import time
+from collections import defaultdict
+
+from engine.core.base import UniverseData
+
+MOVEMENTS = ("UP", "DOWN", "LEFT", "RIGHT")
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of a sorted list"""
+    if not values:
+        return 0.0
+    index = max(0, min(len(values) - 1, math.ceil(percent / 100 * len(values)) - 1))
+    return values[index]
+
+
+def parse_action(text):
+    text = text.strip()
+    return int(text) if text.isdigit() else text
+
+
+def load_script(path):
+    with open(path, "r", encoding="utf-8") as file:
+        return [parse_action(line) for line in file if line.strip() and not line.lstrip().startswith("#")]
+
+
+def random_actions(count, seed=None, actions=MOVEMENTS + ("INTERACT",)):
+    rng = random.Random(seed)
+    return [rng.choice(actions) for _ in range(count)]
+
+
+class HeadlessRunner:
+    def __init__(self, universe, text_answer=1, ticks_per_action=0):
+        """
+        :param universe: the UniverseData to drive
+        :param text_answer: what is typed when the game asks for a text input (e.g. how many items to buy)
+        :param ticks_per_action: simulation ticks run after each action, to include NPCs and timers in the measure
+        """
+        self.universe = universe
+        self.text_answer = text_answer
+        self.ticks_per_action = ticks_per_action
+        self.latencies = defaultdict(list)  # mode -> seconds taken by each action handled in this mode
+        self.elapsed = 0.0
+        self.mode_changes = 0
+
+        # the UI usually provides those two callbacks
+        universe.set_mode_change_callback(self.on_mode_change)
+        universe.request_text_input = self.text_input
+
+    def on_mode_change(self, mode):
+        self.mode_changes += 1
+
+    def text_input(self, callback, prompt="", input_type="string", **kwargs):
+        callback(self.text_answer if input_type != "string" else str(self.text_answer))
+
+    def send(self, action):
+        if action == "QUIT":
+            return  # saves and exits the process, not something to benchmark
+        mode = self.universe.mode
+        start = time.perf_counter()
+        self.universe.input_system(self.universe, action)
+        for _ in range(self.ticks_per_action):
+            self.universe.simulation.tick()
+        duration = time.perf_counter() - start
+        self.latencies[mode].append(duration)
+        self.elapsed += duration
+
+    def run(self, actions):
+        for action in actions:
+            self.send(action)
+        return self.report()
+
+    def report(self):
+        total = sum(len(values) for values in self.latencies.values())
+        report = {
+            "actions": total,
+            "seconds": self.elapsed,
+            "actions_per_second": total / self.elapsed if self.elapsed else 0.0,
+            "mode_changes": self.mode_changes,
+            "modes": {},
+        }
+        for mode, values in self.latencies.items():
+            values = sorted(values)
+            report["modes"][mode] = {
+                "actions": len(values),
+                "p50_ms": percentile(values, 50) * 1000,
+                "p90_ms": percentile(values, 90) * 1000,
+                "p99_ms": percentile(values, 99) * 1000,
+                "max_ms": values[-1] * 1000,
+            }
+        return report
+
+
+def print_report(report):
+    print(f"{report['actions']} actions in {report['seconds']:.3f}s : {report['actions_per_second']:.0f} actions/s "
+          f"({report['mode_changes']} mode changes)")
+    print(f"{'mode':<14}{'actions':>9}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for mode, stats in sorted(report["modes"].items()):
+        print(f"{mode:<14}{stats['actions']:>9}{stats['p50_ms']:>10.4f}{stats['p90_ms']:>10.4f}"
+              f"{stats['p99_ms']:>10.4f}{stats['max_ms']:>10.4f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the engine without UI and measure its throughput.")
+    parser.add_argument("--universe", default="headless", help="universe name (its save is loaded if it exists)")
+    parser.add_argument("--player", default="hero")
+    parser.add_argument("--world", default="default", help="starting world")
+    parser.add_argument("--position", type=int, nargs=2, default=(2, 2), metavar=("Y", "X"))
+    parser.add_argument("--size", type=int, nargs=2, default=(20 * 2, 71), metavar=("LINES", "COLUMNS"))
+    parser.add_argument("--script", help="file with one action per line")
+    parser.add_argument("--random", type=int, default=1000, help="number of random actions if there is no script")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--ticks", type=int, default=0, help="simulation ticks after each action")
+    parser.add_argument("--journal", action="store_true",
+                        help="record the save journal (off by default, so each run starts from the same state "
+                             "and no save is made during the measure)")
+    args = parser.parse_args(argv)
+
+    universe = UniverseData(args.world, tuple(args.size), args.universe, args.player, tuple(args.position),
+                            journal=args.journal)
+    actions = load_script(args.script) if args.script else random_actions(args.random, args.seed)
+    runner = HeadlessRunner(universe, ticks_per_action=args.ticks)
+    print_report(runner.run(actions))
+
+
+if __name__ == "__main__":
+    main()
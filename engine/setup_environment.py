@@ -34,7 +34,7 @@ Node fields (common)
   speaker allows to show the sprite of the speaker, the name has to match an entry in assets/sprites/
 - `text` (required)
   - Type: string
-  - The message shown to the player. Can contain newlines. Long text is allowed. The ui will handle wrapping/scrolling so don't worry about it.
+  - The message shown to the player. Can contain newlines. Long text is allowed. It is cut in pages that fit the info screen, the player shows the next page with INTERACT.
 - `require` (optional)
   - Type: dictionary
   - Conditions can be multiples, all in the dictionnary
@@ -251,8 +251,10 @@ input_file = os.path.join(path, 'assets/maps/MAPS_FORMAT.txt')
 if not os.path.exists(input_file):
     with open(input_file, "w", encoding="utf-8") as f:
         f.write("""Maps are quite easy to make. It's a simple text file, translated to a double array of characters by the program.
-For the dimensions, you can choose the size you want but the max has to be the size of a screen you choose in the main.py, because if you dont and the terminal is not big enough it will crash.
-Dont forget to put a border tho it will disapear behind the screen border if you made the map as big as possible (it's pretty I promise).
+For the dimensions, you can choose the size you want. If the map is bigger than the scene screen chosen in the main.py, the screen only shows the part of the map around the player and follows them.
+Big map files (more than 256 Ko) are not loaded at once, they are read by bands of rows around the player, so one big overworld is fine.
+To make the loading faster, you can compile your maps with `python engine/compile_maps.py`, it writes assets/maps/maps.pack that the game uses instead of the text files. A map edited after the compilation is read from its text file until you compile again.
+Dont forget to put a border tho it will disapear behind the screen border on the edges of the map (it's pretty I promise).
 Here is an example of a simple map that was made:
 
 %%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
@@ -281,13 +283,14 @@ For example the map above is stored in assets/maps/village2.txt
 
 You may have noticed multiple things. You have a lot of different characters, even unicode ones, and you have a lot of '£'.
 The map is not rectangular either.
-This is because of the unicode characters, they take 2 characters in the terminal but are registered as one character in the text file and the array.
-It leads to collisions problems, this is why we use '£' after unicode characters as the ui turns them into '' but the collision is still there. I did not find a better way for now so please if you want to use unicode, you can absolutelu but you HAVE TO had a '£' after each unicode character.
-Don't worry about the fact that the map is currently not rectangular, as the '£' are not visible, it looks rectangular in the end.
+This is because of the unicode characters, some of them (emojis, CJK...) take 2 columns in the terminal but are only one character in the text file.
+Every column of the map is a tile, so the tile on the right of a wide character holds a '£' : it is not drawn and it is not walkable.
+You don't have to write the '£' anymore, the engine adds it after every wide character that does not have one when it reads the map. The maps that already have them work as before.
+Don't worry about the fact that the map is currently not rectangular in the text file, it looks rectangular in the terminal.
 
 By default, the walkable characters are:
 ['.', ',', ';', ':', '*', ' '] so in our exemple, all the areas with '*' are walkable.
-For now, if you want to change the walkable characters, you have to do a self.walkable_tiles = [...] when you create your map function/class (Sorry for that I did not make a method to change that yet).
+To change the walkable characters, assign them when you create your map function/class: world.walkable_tiles = [...] (any list, tuple or string of characters). They are stored as a tuple, so world.walkable_tiles.append(...) does not work: assign them again instead, e.g. world.walkable_tiles = (*world.walkable_tiles, '~').
 
 Informations to add a map to the game are in extensions/data_extensions.py but here is a quick summary:
 you can either use a class or a function to create your map. I suggess using a function most of the time as it's easier but you have the choice. Use a class if you need special values or methods for your map.
@@ -488,7 +491,7 @@ if not os.path.exists(input_file):
     with open(input_file, "w", encoding="utf-8") as f:
         f.write("""Sprite are quite easy to make. It's a simple text file, translated to a double array of characters by the program.
 I strongly recommend using ascii characters however since the sprites are not meant to have any interaction with the player (I mean no moving and no collisions) you can use any characters you want.
-Unicode characters take two spaces so it makes things little weird but it messes up with the collision system so it should be fine here, however I never tried so I can't guarantee it will work perfectly.
+Unicode characters that take two columns (emojis...) are fine, the width of the sprite is counted in terminal columns so it is still centered. A '£' is never drawn.
 Here is an example of a bat that I made:
 
  |\  /\_/\  /|
@@ -627,7 +630,8 @@ def main():
         sys.executable,   # python used to launch THIS script
         script_path,
         universe_name,
-        player_name
+        player_name,
+        *sys.argv[1:2]  # optional render backend, e.g. python launch_game.py ansi
     ])
 
 if __name__ == "__main__":
@@ -650,6 +654,8 @@ def main():
     # load name and player from command-line arguments, passed from launch_game.py
     universe_name = sys.argv[1]
     player_name = sys.argv[2]
+    # optional render backend : "curses" (default) or "ansi" (one write per frame, faster over ssh)
+    backend = sys.argv[3] if len(sys.argv) > 3 else "curses"
 
     # loading the universe here
     # you choose the starting world here, it's where the character will first spawn
@@ -665,7 +671,7 @@ def main():
     from engine.ui.curses_ui import CursesUI
 
     # Create the interface object that will handle rendering and input
-    interface = CursesUI(data) # curses for now but le engine is separated from the ui so you can make your own ui if you want
+    interface = CursesUI(data, backend=backend) # curses or ansi for now but le engine is separated from the ui so you can make your own ui if you want
     interface.run()  # start the display and game loop
 
 if __name__ == "__main__":
@@ -0,0 +1,361 @@
+"""
+Render backends of CursesUI. The modes never talk to a backend : they draw into the FrameBuffer of the frame,
+then the UI sends the changed runs of cells to the backend with write() and ends the frame with refresh().
+
+A backend has :
+    run(main_loop)      sets the terminal up, calls main_loop(backend) and restores the terminal
+    size()              (lines, columns) of the terminal
+    clear()             the next frame starts from a blank terminal
+    write(y, x, text)   text at a position, text never goes past the right side of the terminal
+    refresh()           shows what was written since the last refresh
+    get_key(timeout)    key code (same codes as curses) or -1 after timeout ms, -1 as timeout waits for a key
+and optionally :
+    set_panels(screens)         the panels of the UI (CursesUI.screens), called after each clear()
+    draw_map(grid, camera, panel, overlays)
+                                draws the map and what is on it (((y, x), sprite) in map coordinates) in its own
+                                layer over the inside of the panel, False if it can not (the UI draws them in the frame)
+
+- CursesBackend : curses, one window per panel and a pad for the map, see the class.
+- AnsiBackend : each frame is one string of ANSI escape codes written with a single os.write, on the real
+  terminal or on a FakeTerminal (tests, benchmarks, no tty needed).
+"""
+from collections import deque
+import curses
+import os
+import re
+import select
+import signal
+
+from engine.core.TextWidth import char_width, display_cells
+
+
+def split_columns(text, columns):
+    """text cut after `columns` terminal columns : (left part, rest)"""
+    width = 0
+    for index, char in enumerate(text):
+        width += char_width(char)
+        if width > columns:
+            return text[:index], text[index:]
+    return text, ""
+
+
+class CursesBackend:
+    """
+    Each panel (scene, hud) is its own curses window. A frame only copies (noutrefresh) the windows that were
+    written to and sends everything with one doupdate, so a new line in the hud never repaints the map.
+    The map of the exploration is drawn in a pad by draw_map : a band of the map around the camera, rendered
+    once, scrolling only moves the part of the pad that is shown. The player and the entities are written
+    on the pad and the map tiles under them are put back when they move.
+    """
+    MAP_MARGIN = (16, 32)  # rows and columns of map rendered on each side of the viewport
+
+    def __init__(self, stdscr=None):
+        self.stdscr = stdscr
+        self.panels = {}  # name -> (window, (top, left, height, width))
+        self.touched = set()  # panels written since the last refresh, None for stdscr
+        self.map_pad = None
+        self.map_grid = None
+        self.map_band = (0, 0, 0, 0)  # (top, left, height, width) of the map rendered in the pad
+        self.map_rows = []  # rendered rows of the band, to put the tiles back under the overlays
+        self.map_view = None  # (panel, pad row, pad column) shown this frame, None if the map is not drawn
+        self.map_shown = None  # same thing for the frame on the terminal
+        self.map_overlays = ()
+        self.map_changed = False
+
+    def run(self, main_loop):
+        def start(stdscr):
+            self.stdscr = stdscr
+            curses.curs_set(0)
+            main_loop(self)
+        curses.wrapper(start)
+
+    def size(self):
+        return self.stdscr.getmaxyx()
+
+    def clear(self):
+        self.stdscr.clear()
+        self.touched.add(None)
+
+    def set_panels(self, screens):
+        self.panels = {}
+        for name, screen in screens.items():
+            (top, left), (height, width) = screen["position"], screen["size"]
+            self.panels[name] = (curses.newwin(height, width, top, left), (top, left, height, width))
+        self.map_pad = None  # rebuilt for the size of the new panel
+        self.map_shown = None
+
+    def write(self, y, x, text):
+        for name, (window, (top, left, height, width)) in self.panels.items():
+            if top <= y < top + height and left <= x < left + width:
+                text, rest = split_columns(text, left + width - x)
+                self._addstr(window, y - top, x - left, text)
+                self.touched.add(name)
+                if rest:
+                    self.write(y, left + width, rest)
+                return
+        self._addstr(self.stdscr, y, x, text)
+        self.touched.add(None)
+
+    @staticmethod
+    def _addstr(window, y, x, text):
+        try:
+            window.addstr(y, x, text)
+        except curses.error:
+            pass  # the bottom right cell can be written, but curses can not move the cursor after it
+
+    def draw_map(self, grid, camera, panel, overlays):
+        if panel not in self.panels:
+            return False
+        top, left, height, width = self.panels[panel][1]
+        view_h, view_w = height - 2, width - 2  # inside of the border
+        if view_h <= 0 or view_w <= 0:
+            return False
+        origin_y, origin_x = camera[0] + 1, camera[1] + 1  # first tile shown inside the border
+        band_y, band_x, band_h, band_w = self.map_band
+        if (self.map_pad is None or self.map_grid is not grid or not band_y <= origin_y <= band_y + band_h - view_h
+                or not band_x <= origin_x <= band_x + band_w - view_w):
+            self._render_band(grid, origin_y, origin_x, view_h, view_w)
+            band_y, band_x = self.map_band[:2]
+
+        visible = tuple((y, x, sprite) for (y, x), sprite in overlays
+                        if origin_y <= y < origin_y + view_h and origin_x <= x < origin_x + view_w)
+        if visible != self.map_overlays:
+            for row in {y - band_y for y, _, _ in self.map_overlays}:
+                self._render_row(row)
+            for y, x, sprite in visible:
+                self._addstr(self.map_pad, y - band_y, x - band_x, sprite)
+            self.map_overlays = visible
+            self.map_changed = True
+        self.map_view = (panel, origin_y - band_y, origin_x - band_x)
+        return True
+
+    def _render_band(self, grid, origin_y, origin_x, view_h, view_w):
+        margin_y, margin_x = self.MAP_MARGIN
+        band = (max(0, origin_y - margin_y), max(0, origin_x - margin_x), view_h + 2 * margin_y, view_w + 2 * margin_x)
+        band_y, band_x, band_h, band_w = band
+        if self.map_pad is None or self.map_pad.getmaxyx() != (band_h, band_w):
+            self.map_pad = curses.newpad(band_h, band_w)
+        self.map_grid = grid
+        self.map_band = band
+        # one column per tile, the wide characters cut by the band become spaces
+        self.map_rows = [display_cells(grid.row_text(y, band_x, band_x + band_w)) if y < grid.height else ""
+                         for y in range(band_y, band_y + band_h)]
+        self.map_pad.erase()
+        for row in range(band_h):
+            self._render_row(row)
+        self.map_overlays = ()
+        self.map_changed = True
+
+    def _render_row(self, row):
+        self.map_pad.move(row, 0)
+        self.map_pad.clrtoeol()
+        self._addstr(self.map_pad, row, 0, self.map_rows[row])
+
+    def refresh(self):
+        if None in self.touched:
+            self.stdscr.noutrefresh()
+            for window, _ in self.panels.values():
+                window.touchwin()  # stdscr was copied over them
+            self.touched.update(self.panels)
+        if self.map_shown is not None and (self.map_view is None or self.map_view[0] != self.map_shown[0]):
+            self.panels[self.map_shown[0]][0].touchwin()  # the map is gone, the panel shows its window again
+            self.touched.add(self.map_shown[0])
+        for name, (window, _) in self.panels.items():
+            if name in self.touched:
+                window.noutrefresh()
+        if self.map_view is not None:
+            panel, row, column = self.map_view
+            # the pad goes over its panel each time the panel window was copied or the map changed
+            if self.map_changed or panel in self.touched or self.map_view != self.map_shown:
+                top, left, height, width = self.panels[panel][1]
+                self.map_pad.noutrefresh(row, column, top + 1, left + 1, top + height - 2, left + width - 2)
+        curses.doupdate()
+        self.map_shown = self.map_view
+        self.map_view = None
+        self.map_changed = False
+        self.touched.clear()
+
+    def get_key(self, timeout):
+        self.stdscr.timeout(timeout)
+        return self.stdscr.getch()
+
+
+# escape sequences of the keys -> curses key codes
+ANSI_KEYS = {
+    b"\x1b[A": curses.KEY_UP, b"\x1b[B": curses.KEY_DOWN, b"\x1b[C": curses.KEY_RIGHT, b"\x1b[D": curses.KEY_LEFT,
+    b"\x1bOA": curses.KEY_UP, b"\x1bOB": curses.KEY_DOWN, b"\x1bOC": curses.KEY_RIGHT, b"\x1bOD": curses.KEY_LEFT,
+}
+
+
+def parse_keys(data):
+    """Key codes of bytes read from a terminal"""
+    keys = []
+    position = 0
+    while position < len(data):
+        sequence = data[position:position + 3]
+        if sequence in ANSI_KEYS:
+            keys.append(ANSI_KEYS[sequence])
+            position += 3
+        else:
+            keys.append(data[position])
+            position += 1
+    return keys
+
+
+class Terminal:
+    """
+    The real terminal of AnsiBackend : cbreak mode (no echo, keys read one by one), alternate screen.
+    A resize wakes read_key up (SIGWINCH) and gives curses.KEY_RESIZE, like curses does.
+    """
+    def __init__(self, input_fd=0, output_fd=1):
+        self.input_fd = input_fd
+        self.output_fd = output_fd
+        self.keys = deque()
+        self.saved_mode = None
+        self.resize_pipe = None
+        self.saved_handler = None
+
+    def start(self):
+        import termios
+        import tty
+        self.saved_mode = termios.tcgetattr(self.input_fd)
+        tty.setcbreak(self.input_fd)
+        self.resize_pipe = os.pipe()
+        self.saved_handler = signal.signal(signal.SIGWINCH, lambda *_: os.write(self.resize_pipe[1], b"r"))
+        self.write(b"\x1b[?1049h\x1b[?25l\x1b[2J")  # alternate screen, hidden cursor
+
+    def stop(self):
+        import termios
+        self.write(b"\x1b[?25h\x1b[?1049l")
+        if self.saved_mode is not None:
+            termios.tcsetattr(self.input_fd, termios.TCSADRAIN, self.saved_mode)
+        if self.resize_pipe is not None:
+            signal.signal(signal.SIGWINCH, self.saved_handler)
+            for fd in self.resize_pipe:
+                os.close(fd)
+            self.resize_pipe = None
+
+    def size(self):
+        size = os.get_terminal_size(self.output_fd)
+        return size.lines, size.columns
+
+    def write(self, data):
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self.output_fd, view):]
+
+    def read_key(self, timeout):
+        if not self.keys:
+            sources = [self.input_fd] + ([self.resize_pipe[0]] if self.resize_pipe else [])
+            ready, _, _ = select.select(sources, [], [], None if timeout < 0 else timeout / 1000)
+            if self.resize_pipe and self.resize_pipe[0] in ready:
+                os.read(self.resize_pipe[0], 64)
+                self.keys.append(curses.KEY_RESIZE)
+            if self.input_fd in ready:
+                self.keys.extend(parse_keys(os.read(self.input_fd, 64)))
+        return self.keys.popleft() if self.keys else -1
+
+
+_ESCAPE = re.compile(r"\x1b\[([0-9;?]*)([A-Za-z])")
+
+
+class FakeTerminal:
+    """
+    Terminal in memory for AnsiBackend : it keeps the screen from the escape sequences it receives,
+    counts the writes and returns the keys it was given.
+    """
+    def __init__(self, height=50, width=120, keys=()):
+        self.height = height
+        self.width = width
+        self.keys = deque(keys)
+        self.writes = 0
+        self.bytes = 0
+        self.screen = [[" "] * width for _ in range(height)]
+        self.cursor = (0, 0)
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def size(self):
+        return self.height, self.width
+
+    def read_key(self, timeout):
+        return self.keys.popleft() if self.keys else -1
+
+    def write(self, data):
+        self.writes += 1
+        self.bytes += len(data)
+        text = data.decode("utf-8")
+        position = 0
+        for match in _ESCAPE.finditer(text):
+            self._put(text[position:match.start()])
+            position = match.end()
+            arguments, command = match.groups()
+            if command == "H":
+                y, x = (int(value) for value in arguments.split(";"))
+                self.cursor = (y - 1, x - 1)
+            elif command == "J" and arguments == "2":
+                self.screen = [[" "] * self.width for _ in range(self.height)]
+        self._put(text[position:])
+
+    def _put(self, text):
+        y, x = self.cursor
+        for char in text:
+            width = char_width(char)
+            if 0 <= y < self.height and x + max(width, 1) <= self.width and width:
+                self.screen[y][x] = char
+                if width == 2:
+                    self.screen[y][x + 1] = ""
+            x += width
+        self.cursor = (y, x)
+
+    def dump(self):
+        return "\n".join("".join(row) for row in self.screen)
+
+
+class AnsiBackend:
+    def __init__(self, terminal=None):
+        self.terminal = terminal if terminal is not None else Terminal()
+        self.buffer = []  # escape codes and text of the frame being built
+
+    def run(self, main_loop):
+        self.terminal.start()
+        try:
+            main_loop(self)
+        finally:
+            self.terminal.stop()
+
+    def size(self):
+        return self.terminal.size()
+
+    def clear(self):
+        self.buffer.append("\x1b[2J")
+
+    def write(self, y, x, text):
+        self.buffer.append(f"\x1b[{y + 1};{x + 1}H{text}")
+
+    def refresh(self):
+        if self.buffer:
+            self.terminal.write("".join(self.buffer).encode("utf-8"))  # the whole frame in one write
+            self.buffer.clear()
+
+    def get_key(self, timeout):
+        return self.terminal.read_key(timeout)
+
+
+BACKENDS = {
+    "curses": CursesBackend,
+    "ansi": AnsiBackend,
+}
+
+
+def get_backend(backend):
+    """Backend instance from its name in BACKENDS, or the instance itself"""
+    if isinstance(backend, str):
+        if backend not in BACKENDS:
+            raise ValueError(f"Backend inconnu : {backend} (choix : {', '.join(BACKENDS)})")
+        return BACKENDS[backend]()
+    return backend
@@ -1,10 +1,18 @@
 import curses
+import itertools
+import math
 import os
+import time
 from engine.core.logging_setup import logger
 from engine.core.ItemManager import item_list_renderer, get_item, dealItem, get_item_part
 from engine.core.CombatSystem import combat_system
 from engine.core.DialogueSystem import dialogue_system
 from engine.core.ShopSystem import shop_manager
+from engine.core.SpriteCache import sprite_cache, sprite_path
+from engine.core.TextWidth import display_cells, display_text
+from engine.ui.backends import get_backend
+from engine.ui.frame_buffer import FrameBuffer
+from engine.ui.frame_stats import FrameStats
 
 if os.path.exists("extensions/ui_extensions.py") and os.path.isfile("extensions/ui_extensions.py"):
     import extensions.ui_extensions as ui_ext
@@ -14,13 +22,6 @@ else:
     logger.warning(f"Module 'extensions/ui_extensions' is missing. Please run setup_environment.py in the engine")
     charged = False
 
-curses.initscr()
-
-# Table de correspondance Unicode -> curses ACS
-CHAR_MAP = {
-    '£': '' # when a caracter takes 2 spaces, it fucks the rendering and the collisions so £ create a collision for the remaining space and the '' makes the space invisible. Please add £ after any 2 space taking caracter in your maps
-}
-
 # mapping global, créé une seule fois
 KEY_MAPPING = {
     ord('Z'): "UP", ord('z'): "UP",
@@ -58,22 +59,21 @@ def key_to_action(key):
 # modes de "gameplay"
 
 def exploration_mode(self, stdscr):
-    self.show_scene(stdscr)
-    self.draw_player(stdscr)
-    self.draw_entities(stdscr)
+    if not self.draw_map_layer():
+        self.show_scene(stdscr)
+        self.draw_player(stdscr)
+        self.draw_entities(stdscr)
     # self.draw_events(stdscr) # events dont have sprite for now
     self.draw_hud(stdscr)
 
 def dialogue_mode(self, stdscr):
-    if dialogue_system.current_dialogue:
-        dialogue_system.current_say = self. get_dialogue_segment(((self.screens["hud"]["size"][0]-1)//2), self.screens["hud"]["size"][1]-2)
-        self.draw_dialogue_lines(stdscr, "hud", 1, 1, dialogue_system.current_say)
+    # the pages are cut by the dialogue system when a line is loaded, nothing is wrapped here
+    dialogue_system.set_page_size((self.screens["hud"]["size"][0]-1)//2, self.screens["hud"]["size"][1]-2)
+    self.draw_dialogue_lines(stdscr, "hud", 1, 1, dialogue_system.current_page())
     if dialogue_system.state == "CHOICE":
-        self.draw_dialogue_lines(stdscr, "hud",1,1, dialogue_system.current_say)
-
         for idx, choice in enumerate(dialogue_system.choices):
             self.draw(stdscr, "hud", idx + self.screens["hud"]["size"][0]//2, 1, f"{idx + 1}. {choice}")
-    sprite, (max_x, max_y) = self.load_sprite("assets/sprites/{}.txt".format(dialogue_system.speaker))
+    sprite, (max_x, max_y) = self.load_sprite(sprite_path(dialogue_system.speaker))
     self.draw_sprite("scene",sprite, self.screens["scene"]["size"][0]-max_y-1, (self.screens["scene"]["size"][1]-max_x)//2, stdscr)
 
 
@@ -129,7 +129,7 @@ def combat_mode(self, stdscr):
     self.draw(stdscr, "hud", 0, 0, "COMBAT MODE")
     nb_enemies = len(combat_system.fighters)
     for idx, enemy in enumerate(combat_system.fighters):
-        enemy_sprite, (max_x, max_y) = self.load_sprite("assets/sprites/{}.txt".format(enemy.id))
+        enemy_sprite, (max_x, max_y) = self.load_sprite(sprite_path(enemy.id))
         x = 1 + (idx + 1) * (self.universe.size[1] - 2) // (nb_enemies + 1) - max_x // 2
         y = (self.universe.size[0] - 1) // 2 - max_y - 2
         self.draw(stdscr, "scene", (self.universe.size[0] - 1) // 2 - 2, x, f"{enemy.name}")
@@ -184,12 +184,19 @@ def combat_mode(self, stdscr):
 def debug_mode(self, stdscr):
     exploration_mode(self, stdscr)
     self.draw(stdscr, "hud", 1, 1 + self.screens["hud"]["size"][1] - 12, "DEBUG MODE")
+    # frame stats of the last frames (ms and counts per frame)
+    for idx, line in enumerate(self.frame_stats.overlay_lines()):
+        self.draw(stdscr, "hud", 3 + idx, self.screens["hud"]["size"][1] - 2 - len(line), line)
 
 
 
 class CursesUI:
-    def __init__(self, universe):
+    def __init__(self, universe, target_fps=30, stats_path=None, backend="curses"):
         self.universe = universe
+        self.backend = get_backend(backend)  # where the frames are sent, "curses", "ansi" or a backend instance
+        self.target_fps = target_fps  # frames drawn per second at most while something moves
+        self.frame_stats = FrameStats()  # timings of the last frames, shown in debug mode
+        self.stats_path = stats_path  # if set, the frame stats are written there as JSON when the game exits
         self.modes = {
             "exploration": exploration_mode,
             "dialogue": dialogue_mode,
@@ -199,6 +206,8 @@ class CursesUI:
             "shop": shop_mode
         }
         self.cursor = (0, 0)
+        self.camera = (0, 0)  # map coordinates of the top left corner of the scene viewport
+        self.item_list_cache = (None, [])  # (key, lines) of the page drawn by render_item_list
 
         # the area for screen, the border is inculded
         self.screens = {
@@ -218,6 +227,8 @@ class CursesUI:
             self.modes.update(ui_ext.ui_modes)
 
         self.mode_draw_function = self.modes[universe.mode]
+        # the dialogue pages are cut for the size of the hud (half of it, the choices use the other half)
+        dialogue_system.set_page_size((self.screens["hud"]["size"][0]-1)//2, self.screens["hud"]["size"][1]-2)
         self.universe.set_mode_change_callback(self.change_mode)
 
         self.input_wanted = False
@@ -234,38 +245,76 @@ class CursesUI:
 
 
     def run(self):
-        curses.wrapper(self.main_loop)
+        try:
+            self.backend.run(self.main_loop)
+        finally:
+            if self.stats_path:
+                self.frame_stats.dump(self.stats_path)
 
     def change_mode(self, mode):
         self.mode_draw_function = self.modes.get(mode, exploration_mode)
 
-    def main_loop(self, stdscr):
-        curses.curs_set(0)
-        stdscr.nodelay(True)  # Non-blocking getch()
+    def main_loop(self, backend):
+        frame = None  # the modes draw in this off-screen buffer, only the changed cells are sent to curses
 
         while True:
-            stdscr.erase()
-
-            if stdscr.getmaxyx()[0] <= self.universe.size[0] or stdscr.getmaxyx()[1] <= self.universe.size[1]:
-                stdscr.addstr(0, 0, "Veuillez agrandir la fenêtre")
-            else:
-                self.mode_draw_function(self, stdscr)
-                self.draw_border(self.screens["scene"]["position"], self.screens["scene"]["size"], stdscr)
-                self.draw_border(self.screens["hud"]["position"], self.screens["hud"]["size"], stdscr)
-
-                if self.input_wanted:
-                    # Draw input field with cursor
-                    input_text = self.input_prompt + self.input_buffer + "_"
-                    self.draw(stdscr, "hud", self.input_y, self.input_x, input_text)
+            frame_start = time.monotonic()
+            self.universe.simulation.advance(frame_start)
+            self.frame_stats.start_frame(self.universe.mode)
+            height, width = backend.size()
+            too_small = height <= self.universe.size[0] or width <= self.universe.size[1]
+            if frame is None or frame.getmaxyx() != (height, width):
+                frame = FrameBuffer(height, width)  # resized : everything is redrawn
+                backend.clear()
+                if hasattr(backend, "set_panels"):
+                    backend.set_panels({} if too_small else self.screens)
+            frame.erase()
+
+            with self.frame_stats.timer("draw_ms"):
+                if too_small:
+                    frame.addstr(0, 0, "Veuillez agrandir la fenêtre")
+                else:
+                    self.mode_draw_function(self, frame)
+                    self.draw_border(self.screens["scene"]["position"], self.screens["scene"]["size"], frame)
+                    self.draw_border(self.screens["hud"]["position"], self.screens["hud"]["size"], frame)
 
-                key = stdscr.getch()
-                if key != -1:  # Non-blocking returns -1 if no key pressed
+                    if self.input_wanted:
+                        # Draw input field with cursor
+                        input_text = self.input_prompt + self.input_buffer + "_"
+                        self.draw(frame, "hud", self.input_y, self.input_x, input_text)
+            with self.frame_stats.timer("present_ms"):
+                self.present_frame(frame, backend)
+            with self.frame_stats.timer("refresh_ms"):
+                backend.refresh()
+
+            # waits for a key until the next frame is due, a key press wakes it up right away
+            key = backend.get_key(self.frame_timeout(frame_start))
+            if key != -1 and not too_small:  # -1 if no key was pressed before the timeout
+                with self.frame_stats.timer("input_ms"):
                     if self.input_wanted:
                         self.process_input_key(key)
                     else:
                         self.universe.input_system(self.universe, key_to_action(key))
+            self.frame_stats.end_frame()
 
-            stdscr.refresh()
+    def frame_timeout(self, frame_start):
+        """
+        Milliseconds getch can wait : -1 (until a key is pressed) when the simulation is idle,
+        else until the next tick is due, but never less than the frame time of target_fps.
+        """
+        simulation = self.universe.simulation
+        next_tick = simulation.time_until_next_tick()
+        if next_tick is None:
+            return -1
+        frame_left = frame_start + 1 / self.target_fps - time.monotonic()
+        return max(1, math.ceil(max(frame_left, next_tick) * 1000))
+
+    def present_frame(self, frame, backend):
+        """Send to the backend only the cells of the frame that changed since the last one"""
+        for y, x, text in frame.diff():
+            self.frame_stats.add("addstr_calls")
+            self.frame_stats.add("bytes", len(text.encode("utf-8")))
+            backend.write(y, x, text)
 
     def start_text_input(self, callback, prompt="", input_type="string", max_length=50,y=5,x=1):
         self.input_wanted = True
@@ -310,19 +359,54 @@ class CursesUI:
                 return None
         return value
 
+    def update_camera(self, scene):
+        """Center the viewport on the player, without going past the edges of the map"""
+        view_h, view_w = self.screens["scene"]["size"]
+        y, x = self.universe.player.get_position()
+        grid = scene.grid
+        cam_y = min(max(0, y - view_h // 2), max(0, grid.height - view_h))
+        cam_x = min(max(0, x - view_w // 2), max(0, grid.width - view_w))
+        self.camera = (cam_y, cam_x)
+
+    def draw_map_layer(self):
+        """
+        The backend draws the map, the player and the entities in its own layer over the scene panel
+        (the map pad of CursesBackend). False if it can not : they are then drawn in the frame.
+        """
+        draw_map = getattr(self.backend, "draw_map", None)
+        if draw_map is None:
+            return False
+        scene = self.universe.scenes[self.universe.current_world]
+        self.update_camera(scene)
+        player = self.universe.player
+        overlays = itertools.chain([(player.position, player.sprite)],
+                                   ((entity.position, entity.sprite) for entity in scene.entities.values()))
+        return draw_map(scene.grid, self.camera, "scene", overlays)
+
     def show_scene(self, stdscr):
         scene = self.universe.scenes[self.universe.current_world]
-        for y, ligne in enumerate(scene.map_data):
-            self.draw(stdscr, "scene", y, 0, ligne)
+        self.update_camera(scene)
+        grid = scene.grid
+        view_h, view_w = self.screens["scene"]["size"]
+        cam_y, cam_x = self.camera
+        for y in range(cam_y, min(cam_y + view_h, grid.height)):
+            # one column per tile, the wide characters cut by the viewport become spaces
+            self.draw(stdscr, "scene", y - cam_y, 0, display_cells(grid.row_text(y, cam_x, cam_x + view_w)))
+
+    def draw_on_map(self, stdscr, position, sprite):
+        """Draw something at map coordinates, only if it is inside the viewport"""
+        y, x = position
+        y, x = y - self.camera[0], x - self.camera[1]
+        view_h, view_w = self.screens["scene"]["size"]
+        if 0 <= y < view_h and 0 <= x < view_w:
+            self.draw(stdscr, "scene", y, x, sprite)
 
     def draw_player(self, stdscr):
         player = self.universe.player
-        y, x = player.position
-        self.draw(stdscr, "scene", y, x, player.sprite)
+        self.draw_on_map(stdscr, player.position, player.sprite)
 
     def draw_entity(self, stdscr, entity):
-        y, x = entity.position
-        self.draw(stdscr, "scene", y, x, entity.sprite)
+        self.draw_on_map(stdscr, entity.position, entity.sprite)
 
     def draw_entities(self, stdscr):
         scene = self.universe.scenes[self.universe.current_world]
@@ -330,8 +414,7 @@ class CursesUI:
             self.draw_entity(stdscr, entity)
 
     def draw_event(self, stdscr, event):
-        y, x = event.position
-        self.draw(stdscr, "scene", y, x, event.sprite)
+        self.draw_on_map(stdscr, event.position, event.sprite)
 
     def draw_events(self, stdscr):
         scene = self.universe.scenes[self.universe.current_world]
@@ -364,45 +447,21 @@ class CursesUI:
             stdscr.addstr(y + i, x + w - 1, '│')
 
     def convert_text_special(self, text):
-        # unused for now
         """
-        it checks if the character has to be turned into a special one
-        :param stdscr:
-        :param text:
-        :param y:
-        :param x:
-        :return:
+        Text as it is written on the terminal (the £ of the maps are removed), see engine/core/TextWidth.py.
+        The result is cached, the same strings are drawn at every frame.
         """
-        text_list = list(text)
-        for idx, char in enumerate(text_list):
-            if char in CHAR_MAP:
-                text_list[idx] = CHAR_MAP[char]
-        return ''.join(text_list)
+        return display_text(text)
 
     def load_sprite(self, path):
         """
-        Charge un sprite ASCII depuis un fichier texte.
+        Sprite ASCII d'un fichier texte, lu une seule fois (voir engine/core/SpriteCache.py).
         Retourne :
             - liste des lignes
             - largeur maximale (max_x)
             - hauteur (max_y)
         """
-        sprite_lines = []
-        max_x = 0
-        max_y = 0
-
-        with open(path, "r", encoding='utf-8') as f:
-            for line in f:
-                line = line.rstrip("\n")
-                sprite_lines.append(line)
-
-                length = len(line)
-                if length > max_x:
-                    max_x = length
-
-                max_y += 1
-
-        return sprite_lines, (max_x, max_y)
+        return sprite_cache.get(path)
 
     def draw_sprite(self, scene, sprite_lines, y, x, stdscr):
         """
@@ -430,6 +489,7 @@ class CursesUI:
         else:
             pos = (0, 0)
         text = self.convert_text_special(text)
+        self.frame_stats.add("draw_calls")
         stdscr.addstr(y + pos[0], x + pos[1], text)
 
     def draw_text(self, stdscr, scene, y, x, text):
@@ -472,73 +532,6 @@ class CursesUI:
         if current_line:
             self.draw(stdscr, scene, y, x, current_line)
 
-    def segment_text(self, stdscr, scene,y,x):
-        max_text = ((self.screens[scene]["size"][0]-1)//2) * (self.screens[scene]["size"][1]-2)
-        if len(dialogue_system.current_dialogue)> max_text:
-            while dialogue_system.current_dialogue[max_text] !=" ":
-                max_text -=1
-            new_text = dialogue_system.current_dialogue[:max_text]
-            dialogue_system.current_dialogue = \
-                dialogue_system.current_dialogue[max_text:]
-            return new_text
-        else:
-            return dialogue_system.current_dialogue
-
-    def get_dialogue_segment(self, max_lines, x_max):
-        """
-        Extrait un segment du dialogue, mot par mot, jusqu'à max_lines et x_max par ligne.
-        Retourne une liste de lignes à afficher et met à jour current_dialogue.
-        """
-        text = dialogue_system.current_dialogue
-        words = text.split()
-        y_used = 0
-        current_line = ""
-        size_line = 0
-        displayed_words = 0
-        lines_to_draw = []
-
-        for word in words:
-            word_len = len(word)
-            space_needed = 1 if current_line else 0
-
-            if size_line + word_len + space_needed <= x_max:
-                if current_line:
-                    current_line += " "
-                    size_line += 1
-                current_line += word
-                size_line += word_len
-            else:
-                # ligne complète
-                lines_to_draw.append(current_line)
-                y_used += 1
-                if y_used >= max_lines:
-                    break
-
-                # découper les mots trop longs
-                while word_len > x_max:
-                    part = word[:x_max - 1] + "-"
-                    lines_to_draw.append(part)
-                    y_used += 1
-                    if y_used >= max_lines:
-                        break
-                    word = word[x_max - 1:]
-                    word_len = len(word)
-
-                current_line = word
-                size_line = len(word)
-
-            displayed_words += 1
-
-        if y_used < max_lines and current_line:
-            lines_to_draw.append(current_line)
-
-        # mise à jour du dialogue restant
-        dialogue_system.current_dialogue = " ".join(words[displayed_words:])
-        if dialogue_system.current_dialogue == "":
-            dialogue_system.notify_reading_consumed()
-
-        return lines_to_draw
-
     def draw_dialogue_lines(self, stdscr, scene, y, x, lines):
         """Affiche les lignes déjà préparées."""
         for idx, line in enumerate(lines):
@@ -553,17 +546,14 @@ class CursesUI:
 
     def render_item_list(self, stdscr, scene, title):
         area_h, area_w = self.screens[scene]["size"]
-        inner_w = max(0, area_w - 2)  # space inside borders
         inner_h = max(0, area_h - 2)
 
         # reserve 1 line for title, 1 for header and 1 for page indicator
         max_items = max(1, inner_h - 3)
         item_list_renderer.max_items_per_page = max_items
 
-        item_keys = list(item_list_renderer.items.keys())
-        num_items = len(item_keys)
-
         # pagination
+        num_items = len(item_list_renderer.items)
         max_pages = max(1, (num_items + max_items - 1) // max_items)
         current_index = getattr(item_list_renderer, "current_index", 0)
         if current_index < 0:
@@ -572,17 +562,34 @@ class CursesUI:
             current_index = max_pages - 1
         item_list_renderer.current_index = current_index
 
+        # the lines only change with the list (set_list), the size of the panel, the page or the title
+        key = (item_list_renderer.version, area_h, area_w, current_index, title)
+        if self.item_list_cache[0] != key:
+            self.item_list_cache = (key, self.item_list_lines(area_w, max_items, current_index, max_pages, title))
+        for y, x, text in self.item_list_cache[1]:
+            self.draw(stdscr, scene, y, x, text)
+
+    def item_list_lines(self, area_w, max_items, current_index, max_pages, title):
+        """Lines of a page of render_item_list, as (y, x, text) relative to the panel"""
+        inner_w = max(0, area_w - 2)  # space inside borders
+        item_keys = list(item_list_renderer.items.keys())
+        num_items = len(item_keys)
         start_idx = current_index * max_items
+        lines = []
 
-        # compute category width from item types (the "type" field)
+        # price and category of an item
         get_part_fn = getattr(item_list_renderer, "get_item_part", None)
+
+        def item_part(name, part, default):
+            if callable(get_part_fn):
+                return get_part_fn(name, part)
+            item_data = get_item(name)
+            return item_data.get(part, default) if item_data else default
+
+        # compute category width from item types (the "type" field)
         max_type_len = 0
         for name in item_keys:
-            if callable(get_part_fn):
-                t = get_part_fn(name, "type") or ""
-            else:
-                item_data = get_item(name)
-                t = item_data.get("type", "") if item_data else ""
+            t = item_part(name, "type", "") or ""
             if len(t) > max_type_len:
                 max_type_len = len(t)
         category_w = max(1, max(len("Category"), max_type_len))
@@ -602,9 +609,9 @@ class CursesUI:
             pad = max(0, (inner_w - minimal_total) // 2)
         usable_w = max(1, inner_w - 2 * pad)
 
-        # draw centered title within usable area
+        # centered title within usable area
         title_x = 1 + pad + max(0, (usable_w - len(title)) // 2)
-        self.draw(stdscr, scene, 1, title_x, title)
+        lines.append((1, title_x, title))
 
         # column size constraints requested
         qty_w = max(qty_min, len("Quantity"))
@@ -627,46 +634,21 @@ class CursesUI:
         if name_w < 1:
             name_w = 1
 
-        # compute absolute x positions (relative to hud inner area, +1 for left padding and +pad)
-        x0 = 1 + pad
-        id_x = x0
-        # layout:
+        # a line is one string starting at the left padding :
         # [id_w][space]['│'][space][name_w][space]['│'][space][category_w][space]['│'][space][qty_w][space]['│'][space][price_w]
-        sep1_x = id_x + id_w + 1  # position of first '│' (after id)
-        name_x = sep1_x + 2  # start of name column (after '│' and its right space)
-        sep2_x = name_x + name_w + 1
-        category_x = sep2_x + 2
-        sep3_x = category_x + category_w + 1
-        qty_x = sep3_x + 2
-        sep4_x = qty_x + qty_w + 1
-        price_x = sep4_x + 2
-
-        # headers: first column empty, Item uses remaining space, then Category, Quantity and Price
-        headers = [
-            ("", id_x, id_w),
-            ("Item", name_x, name_w),
-            ("Category", category_x, category_w),
-            ("Quantity", qty_x, qty_w),
-            ("Price", price_x, price_w),
-        ]
-        for h, hx, hw in headers:
-            # ensure header fits: if still larger, truncate (should be rare due to adjustments)
-            h_display = h if len(h) <= hw else h[:hw]
-            hx_center = hx + max(0, (hw - len(h_display)) // 2)
-            self.draw(stdscr, scene, 2, hx_center, h_display)
-
-        # draw vertical separators matching items rows (start after header)
-        sep_positions = (sep1_x, sep2_x, sep3_x, sep4_x)
-        for row in range(3, 3 + max_items):
-            for sx in sep_positions:
-                # left padding space (inside usable area)
-                if sx - 1 >= x0:
-                    self.draw(stdscr, scene, row, sx - 1, " ")
-                # the separator itself
-                self.draw(stdscr, scene, row, sx, "│")
-                # right padding space (inside usable area)
-                if sx + 1 < x0 + usable_w:
-                    self.draw(stdscr, scene, row, sx + 1, " ")
+        x0 = 1 + pad
+
+        def fit(text, width):
+            return text[:width].ljust(width)
+
+        def centered(text, width):
+            text = text[:width]
+            return fit(" " * max(0, (width - len(text)) // 2) + text, width)
+
+        # headers: first column empty, Item uses remaining space, then Category, Quantity and Price, no separator
+        header = "   ".join((centered("", id_w), centered("Item", name_w), centered("Category", category_w),
+                            centered("Quantity", qty_w), centered("Price", price_w)))
+        lines.append((2, x0, header.rstrip()))
 
         # helper to produce single-char input id: 1-9 then a,b,c...
         def input_label_for(n):
@@ -676,54 +658,38 @@ class CursesUI:
                 # 10 -> a, 11 -> b, ...
                 return chr(ord('a') + (n - 10))
 
-        # draw items rows
+        # items rows, the separators are drawn on the empty rows too
         for idx in range(max_items):
             item_idx = start_idx + idx
             if item_idx < num_items:
                 item_name = item_keys[item_idx]
                 quantity = item_list_renderer.items.get(item_name, 0)
-
-                get_part = getattr(item_list_renderer, "get_item_part", None)
-                if callable(get_part):
-                    price = get_part(item_name, "price")
-                    category = get_part(item_name, "type") or ""
-                else:
-                    item_data = get_item(item_name)
-                    price = item_data.get("price", 0) if item_data else 0
-                    category = item_data.get("type", "") if item_data else ""
+                price = item_part(item_name, "price", 0)
+                category = item_part(item_name, "type", "") or ""
 
                 # ID label based on index on the page (1-based)
-                label_num = idx + 1
-                id_label = input_label_for(label_num)
-                self.draw(stdscr, scene, idx + 3, id_x, id_label)
+                id_label = input_label_for(idx + 1)
 
                 # item name truncated to name_w
                 name_text = f"{item_name}"
                 if len(name_text) > name_w:
                     name_text = name_text[:max(0, name_w - 3)] + "..."
-                self.draw(stdscr, scene, idx + 3, name_x, name_text)
-
-                # category: truncate to fit
-                cat_text = f"{category}"
-                if len(cat_text) > category_w:
-                    cat_text = cat_text[:category_w]
-                self.draw(stdscr, scene, idx + 3, category_x, cat_text)
-
-                # quantity: align right in qty_w
-                qty_text = str(quantity).rjust(qty_w)
-                self.draw(stdscr, scene, idx + 3, qty_x, qty_text)
 
                 # price: align right in price_w, add currency suffix if fits
                 price_text = f"{price}G"
                 if len(price_text) > price_w:
                     price_text = price_text[-price_w:]
-                price_text = price_text.rjust(price_w)
-                self.draw(stdscr, scene, idx + 3, price_x, price_text)
+                cells = (fit(id_label, id_w), fit(name_text, name_w), fit(f"{category}", category_w),
+                         str(quantity).rjust(qty_w), price_text.rjust(price_w))
+            else:
+                cells = (" " * id_w, " " * name_w, " " * category_w, " " * qty_w, " " * price_w)
+            lines.append((idx + 3, x0, " │ ".join(cells)[:usable_w]))
 
-        # draw centered page indicator under items within usable area
+        # centered page indicator under items within usable area
         page_text = f"[Page {current_index + 1} / {max_pages}]"
         page_x = 1 + pad + max(0, (usable_w - len(page_text)) // 2)
-        self.draw(stdscr, scene, 3 + max_items, page_x, page_text)
+        lines.append((3 + max_items, page_x, page_text))
+        return lines
 
     def draw_item_detail(self, stdscr, scene, item_id):
         area_h, area_w = self.screens[scene]["size"]
@@ -0,0 +1,74 @@
+from engine.core.TextWidth import PAD, char_width
+
+
+class FrameBuffer:
+    """
+    Off-screen copy of the terminal, one cell per column.
+    It has the part of the curses window API used by the draw functions (addstr, erase, getmaxyx),
+    so the modes draw into it as if it was stdscr. diff() then gives only the runs of cells that changed
+    since the previous frame, which are the only things sent to the terminal.
+    A wide character takes its cell and the next one holds "" (continuation cell).
+    """
+    def __init__(self, height, width):
+        self.height = height
+        self.width = width
+        self.cells = self._blank()
+        self.previous = None  # cells of the last frame sent, None to send everything
+
+    def _blank(self):
+        return [[" "] * self.width for _ in range(self.height)]
+
+    def getmaxyx(self):
+        return self.height, self.width
+
+    def erase(self):
+        self.cells = self._blank()
+
+    def invalidate(self):
+        """Next diff() sends the whole frame (e.g. after the terminal was cleared)"""
+        self.previous = None
+
+    def addstr(self, y, x, text, *attributes):
+        if not 0 <= y < self.height:
+            return
+        row = self.cells[y]
+        for char in text:
+            width = char_width(char) if char != PAD else 1
+            if width == 0:
+                continue
+            if x < 0:
+                x += width
+                continue
+            if x + width > self.width:
+                break
+            if row[x] == "" and x > 0:
+                row[x - 1] = " "  # the left half of a wide character is overwritten
+            if x + 1 < self.width and row[x + 1] == "" and width == 1:
+                row[x + 1] = " "  # the right half of a wide character is overwritten
+            row[x] = char
+            if width == 2:
+                row[x + 1] = ""
+            x += width
+
+    def diff(self):
+        """Yield (y, x, text) for each run of changed cells, then the frame becomes the previous one"""
+        previous = self.previous
+        for y, row in enumerate(self.cells):
+            old = previous[y] if previous is not None else None
+            if old == row:
+                continue
+            x = 0
+            while x < self.width:
+                if old is not None and row[x] == old[x]:
+                    x += 1
+                    continue
+                start = x
+                while x < self.width and (old is None or row[x] != old[x]):
+                    x += 1
+                if row[start] == "" and start > 0:
+                    start -= 1  # a run can not begin in the middle of a wide character
+                if x < self.width and row[x] == "":
+                    x += 1
+                yield y, start, "".join(row[start:x])
+        self.previous = self.cells
+        self.cells = self._blank()
@@ -0,0 +1,74 @@
+import json
+import time
+from collections import deque
+
+# per frame values : times in milliseconds, then counters
+TIMINGS = ("draw_ms", "present_ms", "refresh_ms", "input_ms", "total_ms")
+COUNTERS = ("draw_calls", "addstr_calls", "bytes")
+
+
+class FrameStats:
+    """
+    Measures of the last `size` frames drawn by the UI, in a ring buffer :
+    - draw_ms : the mode_draw_function and the borders, into the frame buffer
+    - present_ms : diff of the frame and writes of the changed cells to the backend
+    - refresh_ms : refresh of the backend (the whole frame is written at once by the ANSI backend)
+    - input_ms : handling of the key pressed during the frame (0 without key), the wait for the key is not counted
+    - total_ms : sum of the above
+    - draw_calls : CursesUI.draw calls, addstr_calls and bytes : what was really sent to the backend
+    Shown in debug_mode, and written as JSON on exit if the UI was given a stats_path.
+    """
+    def __init__(self, size=300):
+        self.frames = deque(maxlen=size)
+        self.current = None
+
+    def start_frame(self, mode):
+        self.current = dict.fromkeys(TIMINGS + COUNTERS, 0)
+        self.current["mode"] = mode
+
+    def end_frame(self):
+        if self.current is not None:
+            self.current["total_ms"] = sum(self.current[name] for name in TIMINGS[:-1])
+            self.frames.append(self.current)
+            self.current = None
+
+    def add(self, name, value=1):
+        if self.current is not None:
+            self.current[name] += value
+
+    def timer(self, name):
+        """with stats.timer("draw_ms"): adds the time spent in the block to the current frame"""
+        return _Timer(self, name)
+
+    def summary(self):
+        """Average and max of each measure over the buffer"""
+        summary = {"frames": len(self.frames)}
+        for name in TIMINGS + COUNTERS:
+            values = [frame[name] for frame in self.frames]
+            summary[name] = {"avg": sum(values) / len(values) if values else 0, "max": max(values, default=0)}
+        return summary
+
+    def overlay_lines(self):
+        summary = self.summary()
+        lines = [f"{str(summary['frames']) + ' frames':<13}{'avg':>8}{'max':>8}"]
+        for name in TIMINGS:
+            lines.append(f"{name:<13}{summary[name]['avg']:>8.3f}{summary[name]['max']:>8.3f}")
+        for name in COUNTERS:
+            lines.append(f"{name:<13}{summary[name]['avg']:>8.1f}{summary[name]['max']:>8}")
+        return lines
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"summary": self.summary(), "frames": list(self.frames)}, file, indent=1)
+
+
+class _Timer:
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.stats.add(self.name, (time.perf_counter() - self.start) * 1000)
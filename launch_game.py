@@ -16,7 +16,8 @@ def main():
         sys.executable,   # python utilisé pour lancer CE script
         script_path,
         universe_name,
-        player_name
+        player_name,
+        *sys.argv[1:2]  # optional render backend, e.g. python launch_game.py ansi
     ])
 
 if __name__ == "__main__":
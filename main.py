@@ -11,6 +11,8 @@ def main():
     # load name and player from command-line arguments, passed from launch_game.py
     universe_name = sys.argv[1]
     player_name = sys.argv[2]
+    # optional render backend : "curses" (default) or "ansi" (one write per frame, faster over ssh)
+    backend = sys.argv[3] if len(sys.argv) > 3 else "curses"
 
     # loading the universe here
     # you choose the starting world here, it's where the character will first spawn
@@ -26,7 +28,7 @@ def main():
     from engine.ui.curses_ui import CursesUI
 
     # Create the interface object that will handle rendering and input
-    interface = CursesUI(data) # curses for now but le engine is separated from the ui so you can make your own ui if you want
+    interface = CursesUI(data, backend=backend) # curses or ansi for now but le engine is separated from the ui so you can make your own ui if you want
     interface.run()  # start the display and game loop
 
 if __name__ == "__main__":
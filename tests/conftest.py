@@ -0,0 +1,15 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def pytest_configure(config):
+    # the engine works relative to the current folder (assets/, extensions/, saves/, game.log) :
+    # the tests run in a temporary folder that links the assets and the extensions of the project
+    folder = tempfile.mkdtemp(prefix="engine_tests_")
+    for name in ("assets", "extensions"):
+        os.symlink(os.path.join(ROOT, name), os.path.join(folder, name))
+    os.chdir(folder)
@@ -0,0 +1,29 @@
+import engine.core.base as base
+from engine.core.base import UniverseData, World, Entity
+
+
+def make_universe(name):
+    base.worlds["plain"] = lambda data, **kwargs: World(data, "plain", "assets/maps/default_map.txt")
+    return UniverseData("plain", (40, 71), name, "hero", (1, 1), journal=False)
+
+
+def test_turning_the_same_way_does_not_make_the_player_dirty():
+    player = make_universe("dirty_player").player
+    player.orientation = "UP"
+    player.dirty = False
+    player.orientation = "UP"
+    assert not player.dirty
+    player.orientation = "LEFT"
+    assert player.dirty
+
+
+def test_an_entity_is_dirty_only_when_a_value_changes():
+    world = make_universe("dirty_entity").scenes["plain"]
+    entity = world.add_entity(Entity(world, "npc", (1, 2), "N"))
+    entity.items = []
+    world.dirty_entities.clear()
+    entity.sprite = entity.sprite
+    assert not world.dirty_entities
+    entity.items.append("key")
+    entity.items = entity.items  # changed in place, assigned again to be saved
+    assert "npc" in world.dirty_entities
@@ -0,0 +1,18 @@
+import engine.core.base as base
+from engine.core.base import UniverseData, World, Event
+
+
+def test_moving_an_event_updates_its_indexes():
+    base.worlds["plain"] = lambda data, **kwargs: World(data, "plain", "assets/maps/default_map.txt")
+    universe = UniverseData("plain", (40, 71), "events_move", "hero", (1, 1), journal=False)
+    world = universe.scenes["plain"]
+    tiles = [(y, x) for y in range(world.grid.height) for x in range(world.grid.width) if world.is_walkable((y, x))]
+    old, new = tiles[-1], tiles[-2]
+    sign = Event(universe, world, "sign", "ON_INTERACT", "DIALOGUE", position=old, dialogue="assets/dialogues/guide.json")
+    world.event_system.add_event(sign)
+    assert not world.is_walkable(old)
+
+    sign.position = new
+    assert world.event_system.get_event(new) is sign
+    assert world.event_system.get_event(old) is None
+    assert world.is_walkable(old) and not world.is_walkable(new)
@@ -0,0 +1,85 @@
+import engine.core.base as base
+from engine.core.base import UniverseData, World, Entity, NPC
+
+
+def make_universe(name):
+    for scene in ("field", "cave"):
+        base.worlds[scene] = lambda data, scene=scene, **kwargs: World(data, scene, "assets/maps/default_map.txt")
+    return UniverseData("field", (40, 71), name, "hero", (1, 1), max_live_scenes=1)
+
+
+def free_tiles(world):
+    return [(y, x) for y in range(world.grid.height) for x in range(world.grid.width) if world.is_walkable((y, x))]
+
+
+def test_walker_still_moves_after_hibernation():
+    universe = make_universe("hibernation_walker")
+    field = universe.scenes["field"]
+    start, goal = free_tiles(field)[0], free_tiles(field)[-1]
+    walker = Entity(field, "walker", start, "W")
+    walker.movable = True
+    walker.walk_speed = 6
+    field.add_entity(walker)
+    walker.walk_to(goal)
+
+    universe.set_world("cave")
+    assert "field" in universe.hibernated_scenes
+    universe.set_world("field")
+
+    field = universe.scenes["field"]
+    walker = field.entities["walker"]
+    assert walker is not None and walker.movable and walker.walk_speed == 6
+    assert tuple(walker.walk_target) == tuple(goal)
+    assert "walker" in field.updating
+    field.update(1.0)
+    assert walker.get_position() != tuple(start)
+
+
+def test_follower_and_npc_keep_their_class_and_target():
+    universe = make_universe("hibernation_follower")
+    field = universe.scenes["field"]
+    tiles = free_tiles(field)
+    npc = field.add_entity(NPC(field, "guide", tiles[0], "G", dialogue="assets/dialogues/guide.json"))
+    follower = Entity(field, "dog", tiles[1], "d")
+    follower.movable = True
+    field.add_entity(follower)
+    follower.walk_to(universe.player)
+
+    universe.set_world("cave")
+    universe.set_world("field")
+
+    field = universe.scenes["field"]
+    npc = field.entities["guide"]
+    assert type(npc) is NPC and npc.dialogue == "assets/dialogues/guide.json"
+    assert len(npc.events) == 1  # its dialogue event is restored, not created a second time
+    assert field.entities["dog"].walk_target is universe.player
+
+
+def test_scene_with_timers_or_custom_updates_stays_live():
+    class Blinker(Entity):
+        def update(self, dt):
+            self.blinks = getattr(self, "blinks", 0) + 1
+            return True
+
+    universe = make_universe("hibernation_timers")
+    field = universe.scenes["field"]
+    tiles = free_tiles(field)
+    blinker = field.add_entity(Blinker(field, "blinker", tiles[0], "*"))
+    field.request_updates(blinker)
+
+    universe.set_world("cave")
+    assert "field" not in universe.hibernated_scenes
+    assert universe.scenes["field"] is field and "blinker" in field.updating
+
+    universe.set_world("field")
+    field.updating.clear()
+    fired = []
+    field.add_timer(5, lambda: fired.append(True))
+    universe.set_world("cave")
+    assert "field" not in universe.hibernated_scenes
+    field.update(5)
+    assert fired == [True]
+
+    universe.set_world("field")
+    universe.set_world("cave")  # nothing left to run, the scene can be hibernated
+    assert "field" in universe.hibernated_scenes
@@ -0,0 +1,39 @@
+from engine.core.MapGrid import MapGrid, ChunkedMapGrid, load_layout, DEFAULT_WALKABLE_TILES
+
+
+def write_map(tmp_path, text):
+    path = tmp_path / "map.txt"
+    path.write_bytes(text.encode("utf-8"))
+    return str(path)
+
+
+def assert_same_grid(path, chunk_rows=2):
+    grid = MapGrid(load_layout(path), DEFAULT_WALKABLE_TILES)
+    chunked = ChunkedMapGrid(path, DEFAULT_WALKABLE_TILES, chunk_rows=chunk_rows)
+    assert (chunked.height, chunked.width) == (grid.height, grid.width)
+    assert chunked.rows() == grid.rows()
+    for y in range(grid.height):
+        for x in range(grid.width):
+            assert chunked.is_walkable(y, x) == grid.is_walkable(y, x)
+
+
+def test_chunked_grid_matches_grid_with_final_newline(tmp_path):
+    path = write_map(tmp_path, "#####\n#. .#\n#...#\n#####\n")
+    assert_same_grid(path)
+    assert not ChunkedMapGrid(path, DEFAULT_WALKABLE_TILES).row_text(3).endswith("\n")
+
+
+def test_chunked_grid_matches_grid_without_final_newline(tmp_path):
+    assert_same_grid(write_map(tmp_path, "#####\n#. .#\n#...#\n#####"))
+
+
+def test_chunked_grid_matches_grid_with_crlf(tmp_path):
+    path = write_map(tmp_path, "#####\r\n#. .#\r\n#####\r\n")
+    chunked = ChunkedMapGrid(path, DEFAULT_WALKABLE_TILES, chunk_rows=2)
+    assert chunked.rows() == ["#####", "#. .#", "#####"]
+
+
+def test_chunked_grid_width_counts_tiles(tmp_path):
+    # é takes 2 bytes and 1 column, 🌳 takes 4 bytes and 2 columns
+    assert_same_grid(write_map(tmp_path, "#é..#\n#🌳.#\n#####\n"))
+    assert ChunkedMapGrid(write_map(tmp_path, "é🌳🌳\n.\n"), DEFAULT_WALKABLE_TILES).width == 5
@@ -0,0 +1,27 @@
+import engine.core.base as base
+from engine.core.base import UniverseData, World, Entity
+
+
+def make_universe(name):
+    # both scenes build a world named "World", like the default World of add_scene
+    for scene in ("north", "south"):
+        base.worlds[scene] = lambda data, **kwargs: World(data, "World", "assets/maps/default_map.txt")
+    return UniverseData("north", (40, 71), name, "hero", (1, 1))
+
+
+def test_moves_are_replayed_in_their_own_scene():
+    universe = make_universe("journal_scene_key")
+    for scene in ("south", "north"):
+        universe.set_world(scene)
+        world = universe.scenes[scene]
+        world.add_entity(Entity(world, "guard", (1, 1), "G"))
+    universe.save_save(wait=True)
+
+    universe.scenes["south"].entities["guard"].set_position((2, 3))
+    universe.scenes["north"].entities["guard"].set_position((3, 2))
+    universe.journal.file.close()  # the game stops here without saving
+
+    loaded = make_universe("journal_scene_key")
+    loaded.set_world("south")
+    assert loaded.scenes["north"].entities["guard"].get_position() == (3, 2)
+    assert loaded.scenes["south"].entities["guard"].get_position() == (2, 3)
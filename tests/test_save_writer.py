@@ -0,0 +1,48 @@
+import threading
+
+from engine.core.SaveWriter import SaveWriter
+
+
+def test_on_error_runs_on_the_thread_that_handles_errors(tmp_path):
+    writer = SaveWriter()
+    blocker = tmp_path / "file"
+    blocker.write_text("not a folder")
+    threads = []
+    writer.submit(str(blocker / "save.json"), b"{}", on_error=lambda: threads.append(threading.current_thread()))
+    assert writer.flush(timeout=5)
+    assert threads == []  # nothing is called on the writer thread
+    writer.handle_errors()
+    assert threads == [threading.current_thread()]
+    writer.handle_errors()
+    assert len(threads) == 1
+
+
+def test_on_written_is_called_once_the_file_is_written(tmp_path):
+    writer = SaveWriter()
+    path = tmp_path / "save.json"
+    written = []
+    writer.submit(str(path), b"{}", on_written=lambda: written.append(path.read_bytes()))
+    assert writer.flush(timeout=5)
+    assert written == [b"{}"]
+
+
+def test_a_file_submitted_again_is_written_after_the_files_submitted_before(tmp_path):
+    writer = SaveWriter()
+    release = threading.Event()
+    order = []
+
+    def blocked():
+        release.wait(5)
+        return b"{}"
+
+    def submit(name, content=b"{}"):
+        writer.submit(str(tmp_path / name), content, on_written=lambda: order.append(name))
+
+    submit("first", blocked)  # keeps the writer busy while the others are queued
+    submit("universe")
+    submit("scene")
+    submit("universe")
+    release.set()
+    assert writer.flush(timeout=5)
+    assert order == ["first", "scene", "universe"]
+    assert writer.coalesced == 1
@@ -0,0 +1,29 @@
+import engine.core.base as base
+from engine.core.base import UniverseData, World, Entity
+
+
+def make_walker(name):
+    base.worlds["plain"] = lambda data, **kwargs: World(data, "plain", "assets/maps/default_map.txt")
+    universe = UniverseData("plain", (40, 71), name, "hero", (1, 1), journal=False)
+    world = universe.scenes["plain"]
+    tiles = [(y, x) for y in range(world.grid.height) for x in range(world.grid.width) if world.is_walkable((y, x))]
+    walker = world.add_entity(Entity(world, "walker", tiles[0], "W", movable=True))
+    return universe, walker, tiles[-1]
+
+
+def test_time_spent_idle_is_not_caught_up_when_updates_resume():
+    universe, walker, goal = make_walker("simulation_idle")
+    simulation = universe.simulation
+    assert simulation.advance(100.0) == 0  # nothing to update, the UI then waits for a key
+    walker.walk_to(goal)
+    assert simulation.advance(160.0) == 0  # the minute spent waiting is not game time
+    assert simulation.tick_count == 0
+    assert simulation.advance(160.0 + simulation.dt) == 1
+
+
+def test_late_frames_still_run_the_late_ticks():
+    universe, walker, goal = make_walker("simulation_late")
+    simulation = universe.simulation
+    walker.walk_to(goal)
+    simulation.advance(10.0)
+    assert simulation.advance(10.0 + 3.5 * simulation.dt) == 3